@@ -1,7 +1,7 @@
 import json
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from src.utils.core.config import Config
 from src.utils.core.logger import get_logger
@@ -20,6 +20,9 @@ class BaseGenerator:
     3. 封装带有重试和错误处理的 LLM 调用
     """
     
+    # 源码精简时仍保留的注释关键字
+    KEEP_COMMENT_KEYWORDS = ("TODO", "FIXME", "SECURITY", "NOTE")
+    
     def __init__(self, scenario: str, config: Optional[Config] = None):
         """
         初始化发电机
@@ -31,9 +34,17 @@ class BaseGenerator:
         self.scenario = scenario
         self.config = config or Config()
         self.llm_client = LLMClient(config=self.config)
+        # 模板在生成器生命周期内不变，按 (scenario, name) 缓存，避免每个样本重复读盘
+        self._template_cache: Dict[Tuple[str, str], str] = {}
+        # 系统/用户提示词共享的注入变量，首次使用时计算
+        self._prompt_base_vars: Optional[Dict[str, str]] = None
         
         # 预加载核心骨架 (System Message)
         self.system_skeleton = self._load_template("system")
+        # 无额外变量时系统提示词与样本无关，首次组装后复用
+        self._composed_system_prompt: Optional[str] = None
+        # 嵌入提示词的源码是否精简（仅影响提示词，不影响产出中的 source/source_hash）
+        self.minify_prompt_source = bool(self.config.get("core.minify_prompt_source", False))
         
     def _load_template(self, template_name: str, scenario: Optional[str] = None) -> str:
         """
@@ -47,6 +58,11 @@ class BaseGenerator:
             str: 模板内容
         """
         target_scenario = scenario or self.scenario
+        cache = self._template_cache
+        cache_key = (target_scenario, template_name)
+        if cache_key in cache:
+            return cache[cache_key]
+        
         if target_scenario == "common":
             base_dir = Path("configs/prompts/common")
         else:
@@ -56,11 +72,55 @@ class BaseGenerator:
         for ext in [".txt", ".yaml"]:
             path = base_dir / f"{template_name}{ext}"
             if path.exists():
-                return load_prompt_template(str(path))
+                cache[cache_key] = load_prompt_template(str(path))
+                return cache[cache_key]
         
         logger.warning(f"Template '{template_name}' not found in {base_dir}")
+        cache[cache_key] = ""
         return ""
 
+    def _prepare_prompt_source(self, symbol) -> str:
+        """
+        返回嵌入提示词的符号源码；开启 core.minify_prompt_source 时做确定性精简
+        
+        精简规则：去掉空行与行尾空白，去掉不含关键字 (TODO/FIXME/...) 的整行注释；
+        Java 等花括号语言同时去掉行首缩进，Python 保留缩进。注释语法按符号自身的
+        文件类型判断。多行字符串（Python 三引号、Java 文本块）内的行原样保留，
+        字符串内容不会被改动。
+        
+        注意：精简后的源码行号与 start_line/end_line 及证据引用不再逐行对应；
+        产出中的 source/source_hash 仍取自原始源码。
+        """
+        source = symbol.source
+        if not self.minify_prompt_source or not source:
+            return source
+        
+        is_python = Path(symbol.file_path).suffix.lower() in (".py", ".pyi")
+        comment_prefix = "#" if is_python else "//"
+        string_delimiters = ('"""', "'''") if is_python else ('"""',)
+        
+        lines = []
+        open_delimiter = None  # 当前所在多行字符串的定界符
+        for line in source.splitlines():
+            if open_delimiter is not None:
+                lines.append(line)
+                if line.count(open_delimiter) % 2 == 1:
+                    open_delimiter = None
+                continue
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if stripped.startswith(comment_prefix):
+                if not any(kw in stripped for kw in self.KEEP_COMMENT_KEYWORDS):
+                    continue
+            else:
+                for delimiter in string_delimiters:
+                    if line.count(delimiter) % 2 == 1:
+                        open_delimiter = delimiter
+                        break
+            lines.append(line.rstrip() if is_python else stripped)
+        return "\n".join(lines)
+
     def _resolve_template_name(self, template_path: Optional[str]) -> Optional[str]:
         """
         Resolve a configured template path to a template name within configs/prompts/{scenario}/.
@@ -85,31 +145,39 @@ class BaseGenerator:
         """获取当前语言的 Profile"""
         return self.config.get_language_profile()
 
+    def _get_prompt_base_vars(self) -> Dict[str, str]:
+        """系统/用户提示词共享的注入变量（role_identity, language, common_json_rules），首次计算后复用"""
+        base_vars = self._prompt_base_vars
+        if base_vars is None:
+            lang_profile = self._get_language_profile()
+            # 角色定义映射: e.g. qa_rule_role
+            role_key = f"{self.scenario}_role"
+            base_vars = {
+                "role_identity": lang_profile.get("system_prompts", {}).get(role_key, ""),
+                "language": self.config.get("language.name", "java").capitalize(),
+                "common_json_rules": self._get_common_json_rules(),
+            }
+            self._prompt_base_vars = base_vars
+        return base_vars
+
     def _build_composed_system_prompt(self, **kwargs) -> str:
         """
-        组装系统提示词
+        组装系统提示词（无额外变量时缓存组装结果）
         
         注入变量：
         - role_identity: 来自 language/*.yaml
         - language: 当前项目语言
         - common_json_rules: 来自 prompts/common/json_rules.txt
         """
-        lang_profile = self._get_language_profile()
-        language_name = self.config.get("language.name", "java").capitalize()
-        
-        # 角色定义映射: e.g. qa_rule_role
-        role_key = f"{self.scenario}_role"
-        role_identity = lang_profile.get("system_prompts", {}).get(role_key, "")
-        
-        common_json_rules = self._get_common_json_rules()
+        cached = self._composed_system_prompt
+        if cached is not None and not kwargs:
+            return cached
         
         try:
-            return self.system_skeleton.format(
-                role_identity=role_identity,
-                language=language_name,
-                common_json_rules=common_json_rules,
-                **kwargs
-            )
+            prompt = self.system_skeleton.format_map({**self._get_prompt_base_vars(), **kwargs})
+            if not kwargs:
+                self._composed_system_prompt = prompt
+            return prompt
         except KeyError as e:
             logger.error(f"Missing required placeholder {e} in system skeleton for {self.scenario}")
             # Fallback: return unformatted or partial
@@ -127,19 +195,8 @@ class BaseGenerator:
         if not template:
             raise ValueError(f"User template '{template_name}' missing for {self.scenario}")
             
-        lang_profile = self._get_language_profile()
-        language_name = self.config.get("language.name", "java").capitalize()
-        role_key = f"{self.scenario}_role"
-        role_identity = lang_profile.get("system_prompts", {}).get(role_key, "")
-        common_json_rules = self._get_common_json_rules()
-        
         try:
-            return template.format(
-                role_identity=role_identity,
-                language=language_name,
-                common_json_rules=common_json_rules,
-                **kwargs
-            )
+            return template.format_map({**self._get_prompt_base_vars(), **kwargs})
         except KeyError as e:
             logger.error(f"Missing business placeholder {e} in template '{template_name}'")
             raise
@@ -196,3 +253,13 @@ class BaseGenerator:
         
         logger.error(f"[{self.scenario}] All {max_retries + 1} generation attempts failed.")
         raise last_error
+
+    def close(self) -> None:
+        """释放 LLM 客户端持有的资源（拒绝日志句柄等，可重复调用）"""
+        self.llm_client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
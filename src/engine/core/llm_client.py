@@ -2,6 +2,7 @@
 LLM 客户端 - 本地 LLM 调用封装（支持 Ollama）
 """
 import json
+import threading
 import time
 from pathlib import Path
 from typing import Optional
@@ -67,6 +68,12 @@ class LLMClient:
             Path(self.config.get('output.intermediate_dir', 'data/intermediate')) / 'rejected' / 'rejected_llm.jsonl'
         )
         self.rejected_log_path.parent.mkdir(parents=True, exist_ok=True)
+        # 拒绝日志句柄按需打开并复用，避免每条记录一次 open/close
+        self._rejected_fh = None
+        self._rejected_lock = threading.Lock()
+        # 时间戳精度为秒，同一秒内复用已格式化的字符串
+        self._ts_second = -1
+        self._ts_text = ""
         
         # 初始化 ChatOpenAI 客户端
         # 注意：Ollama 的 OpenAI 兼容 API (/v1/chat/completions) 使用 max_tokens 参数
@@ -83,6 +90,9 @@ class LLMClient:
         # 初始化 Pydantic 输出解析器
         self.output_parser = PydanticOutputParser(pydantic_object=TrainingSample)
         
+        # 预构建系统提示词的固定后缀（格式说明 + JSON 示例），所有样本共享
+        self._output_rules_prompt = self._build_output_rules_prompt()
+        
         logger.info(f"LLMClient initialized: base_url={self.base_url}, model={self.model}")
     
     def generate_training_sample(
@@ -107,42 +117,8 @@ class LLMClient:
         Raises:
             ValueError: 重试失败后抛出异常
         """
-        # 获取格式说明
-        format_instructions = self.output_parser.get_format_instructions()
-        
-        # 构建 JSON 示例
-        json_example = '''{
-  "scenario": "qa_rule",
-  "instruction": "这个类的功能是什么？",
-  "context": "public class Example { ... }",
-  "thought": {
-    "observations": ["类中包含多个方法"],
-    "inferences": ["这是一个工具类"],
-    "evidence_refs": [],
-    "assumptions": ["方法是公开的"]
-  },
-  "answer": "这个类提供了...",
-  "repo_commit": "abc123",
-  "quality": {}
-}'''
-        
-        # 构建完整的提示词（强调只输出 JSON）
-        full_system_prompt = f"""{system_prompt}
-
-【重要】你必须严格按照以下要求输出：
-1. 只输出一个合法的 JSON 对象
-2. 不要输出任何代码（Java、Python 等）
-3. 不要使用 Markdown 代码块标记（不要用 ```json 或 ``` 包裹）
-4. 不要添加任何解释性文字
-5. 直接以 {{ 开始，以 }} 结束
-
-JSON Schema:
-{format_instructions}
-
-输出示例：
-{json_example}
-
-请直接输出 JSON 对象："""
+        # 系统提示词的固定后缀在初始化时已构建，这里只做一次拼接
+        full_system_prompt = f"{system_prompt}\n\n{self._output_rules_prompt}"
         
         # 重试逻辑
         last_error = None
@@ -220,6 +196,51 @@ JSON Schema:
                 # 等待一小段时间后重试
                 time.sleep(1)
     
+    def _build_output_rules_prompt(self) -> str:
+        """
+        构建系统提示词的固定后缀（强调只输出 JSON）
+        
+        该部分与具体样本无关，只需在初始化时构建一次。
+        
+        Returns:
+            str: 追加在系统提示词之后的输出规则
+        """
+        # 获取格式说明
+        format_instructions = self.output_parser.get_format_instructions()
+        
+        # 构建 JSON 示例
+        json_example = '''{
+  "scenario": "qa_rule",
+  "instruction": "这个类的功能是什么？",
+  "context": "public class Example { ... }",
+  "thought": {
+    "observations": ["类中包含多个方法"],
+    "inferences": ["这是一个工具类"],
+    "evidence_refs": [],
+    "assumptions": ["方法是公开的"]
+  },
+  "answer": "这个类提供了...",
+  "repo_commit": "abc123",
+  "quality": {}
+}'''
+        
+        return "\n".join([
+            "【重要】你必须严格按照以下要求输出：",
+            "1. 只输出一个合法的 JSON 对象",
+            "2. 不要输出任何代码（Java、Python 等）",
+            "3. 不要使用 Markdown 代码块标记（不要用 ```json 或 ``` 包裹）",
+            "4. 不要添加任何解释性文字",
+            "5. 直接以 { 开始，以 } 结束",
+            "",
+            "JSON Schema:",
+            format_instructions,
+            "",
+            "输出示例：",
+            json_example,
+            "",
+            "请直接输出 JSON 对象：",
+        ])
+    
     def _clean_json_output(self, output: str) -> str:
         """
         清理 LLM 输出，移除 Markdown 代码块标记
@@ -279,7 +300,7 @@ JSON Schema:
             error: 错误信息
         """
         rejected_sample = {
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "timestamp": self._utc_timestamp(),
             "system_prompt": system_prompt,
             "user_prompt": user_prompt,
             "raw_output": raw_output,
@@ -288,13 +309,39 @@ JSON Schema:
             "temperature": self.temperature
         }
         
+        line = json.dumps(rejected_sample, ensure_ascii=False) + '\n'
         try:
-            with open(self.rejected_log_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(rejected_sample, ensure_ascii=False) + '\n')
+            with self._rejected_lock:
+                if self._rejected_fh is None:
+                    self._rejected_fh = open(self.rejected_log_path, 'a', encoding='utf-8')
+                self._rejected_fh.write(line)
+                # 每条记录立即落盘，进程异常退出时不丢失拒绝样本
+                self._rejected_fh.flush()
             logger.info(f"Rejected sample logged to {self.rejected_log_path}")
         except Exception as e:
             logger.error(f"Failed to log rejected sample: {e}")
     
+    def _utc_timestamp(self) -> str:
+        """ISO-8601 UTC 时间戳（按秒缓存格式化结果）"""
+        now = time.time_ns() // 1_000_000_000
+        if now != self._ts_second:
+            self._ts_text = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+            self._ts_second = now
+        return self._ts_text
+    
+    def close(self):
+        """关闭拒绝日志句柄（可重复调用）"""
+        with self._rejected_lock:
+            if self._rejected_fh is not None:
+                self._rejected_fh.close()
+                self._rejected_fh = None
+    
+    def __enter__(self) -> "LLMClient":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
     def test_connection(self) -> bool:
         """
         测试 LLM 连接是否正常
@@ -406,3 +453,5 @@ if __name__ == "__main__":
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        client.close()
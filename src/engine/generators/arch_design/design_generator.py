@@ -4,6 +4,7 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 
 import yaml
+from pydantic import TypeAdapter
 from src.schemas import CodeSymbol, TrainingSample, ReasoningTrace, EvidenceRef
 from src.utils.core.config import Config
 from src.utils.core.logger import get_logger
@@ -22,6 +23,9 @@ from src.engine.rag import Retriever
 
 logger = get_logger(__name__)
 
+# 复用同一个序列化器，直接产出 JSON bytes（跳过 str 中转与文本层编码）
+_SAMPLE_ADAPTER = TypeAdapter(TrainingSample)
+
 class DesignQuestion:
     """设计问题模型"""
     def __init__(
@@ -138,7 +142,7 @@ class DesignGenerator(BaseGenerator):
         samples = []
         
         self.config.ensure_output_dirs()
-        with open(self.raw_output_path, 'w', encoding='utf-8') as f_out, \
+        with open(self.raw_output_path, 'wb') as f_out, \
              open(self.rejected_path, 'w', encoding='utf-8') as f_rej:
              
             for i, q in enumerate(design_questions, 1):
@@ -151,7 +155,7 @@ class DesignGenerator(BaseGenerator):
                     
                     sample = self._generate_single(q, symbols, repo_commit, negative_type)
                     if sample:
-                        f_out.write(sample.model_dump_json() + '\n')
+                        f_out.write(_SAMPLE_ADAPTER.dump_json(sample) + b'\n')
                         f_out.flush()
                         samples.append(sample)
                         self.stats['success'] += 1
@@ -280,18 +284,25 @@ class DesignGenerator(BaseGenerator):
             parts.append(f"\n# {layer.capitalize()} 层")
             for s in layer_symbols:
                 if s.symbol_id in added_ids: continue
-                parts.append(f"## {s.qualified_name} (File: {normalize_path_separators(s.file_path)} Lines: {s.start_line}-{s.end_line})\n```{lang}\n{s.source[:800]}\n```")
+                parts.append(self._format_context_block(s, lang))
                 added_ids.add(s.symbol_id)
                 
         # Handle unclassified symbols
         other_symbols = [s for s in symbols if s.symbol_id not in added_ids]
         if other_symbols:
             parts.append("\n# Other Components")
-            for s in other_symbols:
-                parts.append(f"## {s.qualified_name} (File: {normalize_path_separators(s.file_path)} Lines: {s.start_line}-{s.end_line})\n```{lang}\n{s.source[:800]}\n```")
+            parts.extend(self._format_context_block(s, lang) for s in other_symbols)
 
         return "\n".join(parts)
 
+    @staticmethod
+    def _format_context_block(symbol: CodeSymbol, lang: str) -> str:
+        """单个符号的上下文片段（源码截断到前 800 字符）"""
+        return (
+            f"## {symbol.qualified_name} (File: {normalize_path_separators(symbol.file_path)} "
+            f"Lines: {symbol.start_line}-{symbol.end_line})\n```{lang}\n{symbol.source[:800]}\n```"
+        )
+
     def _sample_negative_type(self) -> Optional[str]:
         return sample_negative_type(self.coverage_cfg.negative_ratio, self.coverage_cfg.negative_types, self.negative_rng)
 
@@ -312,27 +323,24 @@ class DesignGenerator(BaseGenerator):
     def _correct_evidence_refs(self, raw_refs: List[Dict], symbols: List[CodeSymbol]) -> List[EvidenceRef]:
         """Correlate LLM evidence refs with trusted symbols"""
         corrected = []
+        # 归一化 ID / 去行号前缀索引只建一次，各 ref 直接查表（同键保留首个符号）
+        id_index, prefix_index = {}, {}
+        for s in symbols:
+            norm_id = normalize_path_separators(s.symbol_id)
+            id_index.setdefault(norm_id, s)
+            prefix_index.setdefault(norm_id.rsplit(':', 1)[0], s)
+        
         for ref in raw_refs:
             if not isinstance(ref, dict): 
                 corrected.append(ref)
                 continue
                 
             ref_id = ref.get('symbol_id', '')
-            best_match = None
-            
-            norm_ref_id = normalize_path_separators(ref_id)
-            for s in symbols:
-                if normalize_path_separators(s.symbol_id) == norm_ref_id:
-                    best_match = s
-                    break
+            best_match = id_index.get(normalize_path_separators(ref_id))
             
             if not best_match and ':' in ref_id:
                 ref_prefix = ref_id.rsplit(':', 1)[0]
-                norm_prefix = normalize_path_separators(ref_prefix)
-                for s in symbols:
-                    if normalize_path_separators(s.symbol_id).rsplit(':', 1)[0] == norm_prefix:
-                        best_match = s
-                        break
+                best_match = prefix_index.get(normalize_path_separators(ref_prefix))
             
             if best_match:
                 ref['symbol_id'] = normalize_path_separators(best_match.symbol_id)
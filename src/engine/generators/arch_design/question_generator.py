@@ -11,7 +11,7 @@ from src.utils.data.sampling import (
     sample_coverage_target, sample_question_type, build_scenario_constraints, build_constraint_rules,
 )
 from src.utils.io.file_ops import load_yaml_list, append_jsonl
-from src.utils.io.loaders import load_symbols_jsonl
+from src.utils.io.loaders import iter_symbols_jsonl
 from src.utils.generation.config_helpers import parse_coverage_config, create_seeded_rng, resolve_design_limit
 from src.engine.core import BaseGenerator
 
@@ -57,15 +57,22 @@ class DesignQuestionGenerator(BaseGenerator):
     ) -> List[Dict[str, Any]]:
         """从仓库符号生成设计问题"""
         logger.info(f"Generating design questions from {symbols_path}")
-        symbols = load_symbols_jsonl(symbols_path)
-        if not symbols: return []
+        # 流式加载时即按类型过滤：只保留方法，其余符号不进入内存
+        first_symbol = None
+        methods = []
+        for s in iter_symbols_jsonl(symbols_path):
+            if first_symbol is None:
+                first_symbol = s
+            if s.symbol_type == 'method':
+                methods.append(s)
+        if first_symbol is None: return []
+        logger.info(f"Loaded {len(methods)} methods from {symbols_path}")
         
         if not repo_commit:
-            repo_commit = symbols[0].repo_commit
+            repo_commit = first_symbol.repo_commit
             
         # 1. 过滤候选（主要针对 Controller/Service）
-        candidates = [s for s in symbols if s.symbol_type == 'method' and 
-                      (self.profile.is_controller(s) or self.profile.is_service(s))]
+        candidates = [s for s in methods if self.profile.is_controller(s) or self.profile.is_service(s)]
         
         if not candidates:
             logger.warning("No candidate methods found for design question generation.")
@@ -1,14 +1,18 @@
+import heapq
 import json
 import time
+from collections import Counter
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
 
 from src.schemas import CodeSymbol, MethodProfile, EvidenceRef
 from src.utils.core.config import Config
 from src.utils.core.logger import get_logger
 from src.utils.generation.config_helpers import get_with_fallback
-from src.utils.io.file_ops import read_jsonl, append_jsonl
-from src.utils.io.loaders import load_symbols_jsonl
+from src.utils.io.file_ops import read_jsonl, JsonlAppender
+from src.utils.io.loaders import iter_symbols_jsonl
 from src.utils.data.validator import normalize_path_separators
 from src.engine.core import BaseGenerator
 
@@ -30,11 +34,15 @@ class MethodUnderstander(BaseGenerator):
         
         # 1. 配置加载
         self.profile = self._get_language_profile()
+        qa_markers = self.profile.get_qa_markers() or {}
+        self.marker_annotations = frozenset(qa_markers.get('annotations', []) + qa_markers.get('decorators', []))
         self.max_methods = get_with_fallback(self.config, 'method_understanding.max_methods', 'auto.max_methods', 50)
         
         batching_cfg = self.config.get('method_understanding.batching', {})
         self.output_mode = batching_cfg.get('output_mode', 'overwrite')
         self.resume = bool(batching_cfg.get('resume', False))
+        # 单次 LLM 调用合并的方法数（>1 时共享一次提示词开销，缺失结果回退到单条调用）
+        self.rows_per_call = max(1, int(batching_cfg.get('rows_per_call', 1) or 1))
         
         # 2. 输出路径
         self.output_jsonl = Path(self.config.get('artifacts.method_profiles_jsonl', 'data/intermediate/method_profiles.jsonl'))
@@ -46,11 +54,9 @@ class MethodUnderstander(BaseGenerator):
     def generate_from_symbols(self, symbols_path: Path, repo_commit: str) -> List[MethodProfile]:
         """批量理解流程"""
         logger.info(f"Loading symbols for understanding from {symbols_path}")
-        symbols = load_symbols_jsonl(symbols_path)
-        if not symbols: return []
-        
-        # 1. 筛选并评分
-        candidates = self._select_candidates(symbols)
+        # 1. 流式解析的同时筛选并评分，只保留候选符号
+        candidates = self._select_candidates(iter_symbols_jsonl(symbols_path))
+        if not candidates: return []
         
         # 2. 状态恢复 (Resume)
         processed_ids = self._load_processed_ids() if self.resume else set()
@@ -65,41 +71,149 @@ class MethodUnderstander(BaseGenerator):
         self.output_jsonl.parent.mkdir(parents=True, exist_ok=True)
         results = []
         
-        for i, symbol in enumerate(candidates, 1):
-            logger.info(f"[{i}/{len(candidates)}] Understanding: {symbol.qualified_name}")
-            
-            try:
-                profile = self._generate_profile(symbol, repo_commit)
-                append_jsonl(self.output_jsonl, json.loads(profile.model_dump_json()))
-                results.append(profile)
-                self.stats['success'] += 1
-            except Exception as e:
-                logger.error(f"Failed to understand {symbol.symbol_id}: {e}")
-                append_jsonl(self.rejected_jsonl, {'symbol_id': symbol.symbol_id, 'error': str(e)})
-                self.stats['failed'] += 1
+        # 多方法合并调用时按源码长度排序再切块，同一次调用内的方法规模相近，
+        # 避免短方法陪着最长的方法一起等待
+        if self.rows_per_call > 1:
+            candidates.sort(key=lambda s: len(s.source))
+        
+        # 输出/拒绝句柄各只打开一次，逐条写入并 flush（支持中断后 resume）
+        # 按 rows_per_call 顺序切块：islice 逐块取用，不做列表切片拷贝
+        total = len(candidates)
+        pending = iter(candidates)
+        done = 0
+        with open(self.output_jsonl, 'ab') as out_f, JsonlAppender(self.rejected_jsonl) as rej_f:
+            while chunk := list(islice(pending, self.rows_per_call)):
+                for i, symbol in enumerate(chunk, done + 1):
+                    logger.info(f"[{i}/{total}] Understanding: {symbol.qualified_name}")
+                done += len(chunk)
+                
+                for symbol, profile, error in self._understand_chunk(chunk, repo_commit):
+                    if error is None:
+                        out_f.write(profile.model_dump_json().encode('utf-8') + b'\n')
+                        out_f.flush()
+                        results.append(profile)
+                        self.stats['success'] += 1
+                    else:
+                        logger.error(f"Failed to understand {symbol.symbol_id}: {error}")
+                        rej_f.write({'symbol_id': symbol.symbol_id, 'error': str(error)})
+                        rej_f.flush()
+                        self.stats['failed'] += 1
                 
         return results
 
-    def _select_candidates(self, symbols: List[CodeSymbol]) -> List[CodeSymbol]:
-        """筛选高价值方法作为理解对象"""
-        methods = [s for s in symbols if s.symbol_type == 'method']
-        scored = [(self._calculate_priority_score(s), s) for s in methods]
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return [s for _, s in scored[:self.max_methods]]
+    def _select_candidates(self, symbols: Iterable[CodeSymbol]) -> List[CodeSymbol]:
+        """筛选高价值方法作为理解对象（可直接消费流式符号，只保留 top-N）"""
+        # 评分与业务注解统计在同一遍中完成，每个符号的注解只遍历一次
+        marker_counter = Counter()
+        stats = {'methods': 0}
+        
+        def _scored():
+            for s in symbols:
+                if s.symbol_type != 'method':
+                    continue
+                stats['methods'] += 1
+                yield (self._calculate_priority_score(s, marker_counter), s)
+        
+        # itemgetter 在 C 层取键；sort/nlargest 均稳定，同分时保持符号原始顺序
+        if isinstance(self.max_methods, int) and self.max_methods >= 0:
+            top = heapq.nlargest(self.max_methods, _scored(), key=itemgetter(0))
+        else:
+            top = sorted(_scored(), key=itemgetter(0), reverse=True)
+        logger.info(f"Selected {len(top)} candidates from {stats['methods']} methods")
+        if marker_counter:
+            logger.info(f"Marker annotations among {stats['methods']} methods: {dict(marker_counter.most_common(10))}")
+        return [s for _, s in top]
 
-    def _calculate_priority_score(self, symbol: CodeSymbol) -> int:
-        """评分逻辑：业务注解越丰富，优先级越高"""
+    def _calculate_priority_score(self, symbol: CodeSymbol, marker_counter: Optional[Counter] = None) -> int:
+        """评分逻辑：业务注解越丰富，优先级越高（可顺带累计命中的业务注解）"""
         score = 0
-        qa_markers = self.profile.get_qa_markers() or {}
-        markers = set(qa_markers.get('annotations', []) + qa_markers.get('decorators', []))
-        
-        for ann in symbol.annotations:
-            if ann.name in markers: score += 10
+        hits = [ann.name for ann in symbol.annotations if ann.name in self.marker_annotations]
+        score += 10 * len(hits)
+        if marker_counter is not None and hits:
+            marker_counter.update(hits)
             
         if symbol.doc: score += 5
         if 10 <= symbol.line_count <= 100: score += 5
         return score
 
+    def _understand_chunk(
+        self, chunk: List[CodeSymbol], repo_commit: str
+    ) -> Iterator[Tuple[CodeSymbol, Optional[MethodProfile], Optional[Exception]]]:
+        """处理一组方法：多条合并为一次调用，未返回或不合法的方法回退到单条调用"""
+        outputs: Dict[str, Dict[str, Any]] = {}
+        if len(chunk) > 1:
+            try:
+                outputs = self._generate_profiles_multi(chunk, repo_commit)
+            except Exception as e:
+                logger.warning(f"Multi-method understanding failed for {len(chunk)} methods, falling back: {e}")
+        
+        for symbol in chunk:
+            output_dict = outputs.get(normalize_path_separators(symbol.symbol_id))
+            try:
+                if output_dict is not None:
+                    try:
+                        yield symbol, self._to_profile(output_dict), None
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Invalid profile for {symbol.symbol_id} in multi-method output, retrying alone: {e}")
+                profile = self._generate_profile(symbol, repo_commit)
+            except Exception as e:
+                yield symbol, None, e
+                continue
+            yield symbol, profile, None
+
+    def _generate_profiles_multi(self, chunk: List[CodeSymbol], repo_commit: str) -> Dict[str, Dict[str, Any]]:
+        """一次 LLM 调用生成多个方法的规格，返回 {symbol_id: profile dict}"""
+        blocks = []
+        for i, symbol in enumerate(chunk, 1):
+            evidence_ref = {
+                'symbol_id': normalize_path_separators(symbol.symbol_id),
+                'file_path': normalize_path_separators(symbol.file_path),
+                'start_line': symbol.start_line,
+                'end_line': symbol.end_line,
+                'source_hash': symbol.source_hash,
+            }
+            blocks.append("\n".join([
+                f"### 方法 {i}",
+                f"**符号标识**: {evidence_ref['symbol_id']}",
+                f"**文件路径**: {evidence_ref['file_path']}",
+                f"**完全限定名**: {symbol.qualified_name}",
+                f"**注解/装饰器**: {self._format_annotations(symbol)}",
+                f"**文档说明**: {symbol.doc or '无'}",
+                f"**证据引用**: {json.dumps(evidence_ref, ensure_ascii=False)}",
+                "**方法源码**:",
+                "```",
+                self._prepare_prompt_source(symbol),
+                "```",
+            ]))
+        
+        system_prompt = self._build_composed_system_prompt()
+        user_prompt = self._build_composed_user_prompt(
+            "user_multi",
+            count=len(chunk),
+            methods_block="\n\n".join(blocks),
+            repo_commit=repo_commit
+        )
+        
+        output = self.generate_with_retry(system_prompt, user_prompt)
+        profiles = output.get('profiles', []) if isinstance(output, dict) else []
+        return {
+            normalize_path_separators(str(p['symbol_id'])): p
+            for p in profiles
+            if isinstance(p, dict) and p.get('symbol_id')
+        }
+
+    @staticmethod
+    def _format_annotations(symbol: CodeSymbol) -> str:
+        """提示词中的注解/装饰器列表（单方法与多方法模板共用）"""
+        return ", ".join(f"@{a.name}" for a in symbol.annotations) or "无"
+
+    def _to_profile(self, output_dict: Dict[str, Any]) -> MethodProfile:
+        """LLM 输出 dict -> MethodProfile（转换 evidence_refs）"""
+        raw_refs = output_dict.get('evidence_refs', [])
+        output_dict['evidence_refs'] = [EvidenceRef(**ref) if isinstance(ref, dict) else ref for ref in raw_refs]
+        return MethodProfile(**output_dict)
+
     def _generate_profile(self, symbol: CodeSymbol, repo_commit: str) -> MethodProfile:
         """调用 LLM 生成深度规格"""
         system_prompt = self._build_composed_system_prompt()
@@ -108,9 +222,9 @@ class MethodUnderstander(BaseGenerator):
             symbol_id=normalize_path_separators(symbol.symbol_id),
             file_path=normalize_path_separators(symbol.file_path),
             qualified_name=symbol.qualified_name,
-            annotations=", ".join([f"@{a.name}" for a in symbol.annotations]) or "无",
+            annotations=self._format_annotations(symbol),
             javadoc=symbol.doc or "无",
-            source_code=symbol.source,
+            source_code=self._prepare_prompt_source(symbol),
             start_line=symbol.start_line,
             end_line=symbol.end_line,
             source_hash=symbol.source_hash,
@@ -118,12 +232,7 @@ class MethodUnderstander(BaseGenerator):
         )
         
         output_dict = self.generate_with_retry(system_prompt, user_prompt)
-        
-        # 转换 evidence_refs
-        raw_refs = output_dict.get('evidence_refs', [])
-        output_dict['evidence_refs'] = [EvidenceRef(**ref) if isinstance(ref, dict) else ref for ref in raw_refs]
-        
-        return MethodProfile(**output_dict)
+        return self._to_profile(output_dict)
 
     def _load_processed_ids(self) -> Set[str]:
         if not self.output_jsonl.exists(): return set()
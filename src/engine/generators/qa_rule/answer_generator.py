@@ -1,4 +1,6 @@
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
@@ -11,7 +13,7 @@ from src.utils.generation.config_helpers import (
     parse_output_paths, create_seeded_rng, get_with_fallback
 )
 from src.utils.io.file_ops import (
-    write_json, load_yaml_file, read_jsonl, append_jsonl
+    write_json, load_yaml_file, read_jsonl, append_jsonl, BackgroundJsonlWriter
 )
 from src.utils.data.validator import normalize_path_separators
 from src.engine.core import BaseGenerator
@@ -38,6 +40,13 @@ class AnswerGenerator(BaseGenerator):
         
         # 2. 解析业务配置
         self.batch_size = self.config.get('question_answer.batch_size', None)
+        # 并发 LLM 请求数（1 为串行；受限于服务端吞吐/限流，按需调大）
+        self.llm_concurrency = max(1, int(self.config.get('question_answer.llm_concurrency', 1) or 1))
+        # 上下文字符预算（默认关闭：不截断、不丢弃检索到的符号）
+        self.context_char_budget = self.config.get('question_answer.context_char_budget')
+        # 截断标记使用当前语言的注释语法
+        is_python = str(self.config.get("language.name", "java")).lower() == "python"
+        self.context_truncation_marker = f"\n{'#' if is_python else '//'} ... (源码已截断)"
         self.coverage_cfg = parse_coverage_config(self.config, 'question_answer')
         self.constraints_cfg = parse_constraints_config(self.config, 'question_answer')
         self.negative_rng = create_seeded_rng(self.config)
@@ -56,6 +65,8 @@ class AnswerGenerator(BaseGenerator):
 
         # 5. 统计初始化
         self.stats = {'total_questions': 0, 'success': 0, 'failed': 0}
+        # 每个工作线程独立的 evidence autofill 标记
+        self._local = threading.local()
         self.retrieval_stats = {
             "mode": self.config.get('generation.retrieval_mode', 'hybrid'),
             "negative_samples": 0,
@@ -84,48 +95,83 @@ class AnswerGenerator(BaseGenerator):
 
         samples = []
         self.config.ensure_output_dirs()
+        # 符号列表在整个批次内共享，避免每个问题重建一次
+        all_symbols = list(symbols_map.values())
         
-        with open(self.output_paths.output_jsonl, 'w', encoding='utf-8') as f_out, \
-             open(self.output_paths.rejected_jsonl, 'w', encoding='utf-8') as f_rej:
+        # A. 采样极性：在主线程按问题顺序采样，随机序列与并发度无关
+        negative_types = []
+        for question in questions:
+            negative_type = self._sample_negative_type()
+            if negative_type:
+                self.retrieval_stats["negative_samples"] += 1
+            else:
+                self.retrieval_stats["positive_samples"] += 1
+            negative_types.append(negative_type)
+        
+        def _answer(i: int):
+            question = questions[i]
+            logger.info(f"[{i + 1}/{len(questions)}] Generating answer for: {question.question[:50]}...")
+            try:
+                # B. 单个生成
+                return self._generate_answer(question, all_symbols, negative_types[i], symbols_map), None
+            except Exception as e:
+                logger.error(f"Failed question {question.question_id}: {e}", exc_info=True)
+                return None, e
+        
+        # 并发时按预估上下文长度从长到短派发：线程池空出一个槽位就接下一个问题，
+        # 长请求不会堆在队尾拖慢整批
+        dispatch_order = range(len(questions))
+        if self.llm_concurrency > 1:
+            dispatch_order = sorted(
+                dispatch_order,
+                key=lambda i: self._estimate_answer_cost(questions[i], symbols_map),
+                reverse=True
+            )
+        
+        # 写盘交给后台线程，生成循环不阻塞在磁盘 I/O 上；LLM 调用按 llm_concurrency 并发，
+        # 结果按问题顺序落盘
+        with BackgroundJsonlWriter(self.output_paths.output_jsonl) as f_out, \
+             BackgroundJsonlWriter(self.output_paths.rejected_jsonl) as f_rej, \
+             ThreadPoolExecutor(max_workers=self.llm_concurrency, thread_name_prefix="qa-answer") as pool:
             
-            for i, question in enumerate(questions, 1):
-                logger.info(f"[{i}/{len(questions)}] Generating answer for: {question.question[:50]}...")
-                
-                try:
-                    # A. 采样极性
-                    negative_type = self._sample_negative_type()
-                    if negative_type:
-                        self.retrieval_stats["negative_samples"] += 1
-                    else:
-                        self.retrieval_stats["positive_samples"] += 1
-                        
-                    # B. 单个生成
-                    sample = self._generate_answer(question, list(symbols_map.values()), negative_type)
-                    
+            futures = [None] * len(questions)
+            for i in dispatch_order:
+                futures[i] = pool.submit(_answer, i)
+            
+            for question, future in zip(questions, futures):
+                sample, error = future.result()
+                if error is None:
                     # C. 持久化
-                    f_out.write(sample.model_dump_json() + '\n')
-                    f_out.flush()
+                    f_out.write(sample.model_dump_json())
                     samples.append(sample)
                     self.stats['success'] += 1
-                    
-                except Exception as e:
-                    logger.error(f"Failed question {question.question_id}: {e}", exc_info=True)
-                    f_rej.write(json.dumps({
+                else:
+                    f_rej.write({
                         'question_id': question.question_id,
-                        'error': str(e),
+                        'error': str(error),
                         'timestamp': question.created_at
-                    }, ensure_ascii=False) + '\n')
-                    f_rej.flush()
+                    })
                     self.stats['failed'] += 1
         
         self._write_retrieval_report()
         return samples
 
+    @staticmethod
+    def _estimate_answer_cost(question: QuestionSample, symbols_map: Dict[str, CodeSymbol]) -> int:
+        """粗略估计单个问题的 LLM 输入规模（证据源码长度，无证据时退化为问题长度）"""
+        cost = len(question.question)
+        for ref in question.evidence_refs or ():
+            symbol = symbols_map.get(normalize_path_separators(ref.symbol_id))
+            if symbol is not None:
+                cost += len(symbol.source)
+        return cost
+
     def _generate_answer(
         self,
         question: QuestionSample,
         all_symbols: List[CodeSymbol],
-        negative_type: Optional[str] = None
+        negative_type: Optional[str] = None,
+        symbols_map: Optional[Dict[str, CodeSymbol]] = None
     ) -> TrainingSample:
         """核心生成逻辑"""
         
@@ -135,12 +181,17 @@ class AnswerGenerator(BaseGenerator):
         # A. Direct Hit (优先使用问题自带的证据)
         if question.evidence_refs:
             logger.debug(f"Question has {len(question.evidence_refs)} direct evidence refs. Skipping retrieval.")
-            target_ids = {normalize_path_separators(ref.symbol_id) for ref in question.evidence_refs}
+            if symbols_map is None:
+                symbols_map = {normalize_path_separators(s.symbol_id): s for s in all_symbols}
             
-            # 从 all_symbols 中查找对应的 CodeSymbol 对象
-            for s in all_symbols:
-                if normalize_path_separators(s.symbol_id) in target_ids:
-                    relevant_symbols.append(s)
+            # 按 symbol_id (已归一化) 直接查表，按证据顺序去重
+            seen_ids = set()
+            for ref in question.evidence_refs:
+                target_id = normalize_path_separators(ref.symbol_id)
+                symbol = symbols_map.get(target_id)
+                if symbol is not None and target_id not in seen_ids:
+                    seen_ids.add(target_id)
+                    relevant_symbols.append(symbol)
             
             # 如果没找到任何符号 (e.g. ID mismatch)，回退到 Retrieval
             if not relevant_symbols:
@@ -169,19 +220,17 @@ class AnswerGenerator(BaseGenerator):
         except Exception as e:
             logger.error("Failed to inspect profile: %s", e)
         
-        context_parts = []
-        available_evidence = []
-        for s in relevant_symbols:
-            context_parts.append(f"// File: {normalize_path_separators(s.file_path)}\n// Method: {s.qualified_name}\n{s.source}")
-            available_evidence.append({
+        context, relevant_symbols = self._build_context(relevant_symbols)
+        available_evidence = [
+            {
                 'symbol_id': normalize_path_separators(s.symbol_id),
                 'file_path': normalize_path_separators(s.file_path),
                 'start_line': s.start_line,
                 'end_line': s.end_line,
                 'source_hash': s.source_hash
-            })
-        
-        context = "\n\n".join(context_parts)
+            }
+            for s in relevant_symbols
+        ]
         
         # 2. 组装提示词
         # 获取场景特定的格式约束
@@ -243,6 +292,49 @@ class AnswerGenerator(BaseGenerator):
             quality=quality
         )
 
+    def _build_context(self, symbols: List[CodeSymbol]) -> tuple[str, List[CodeSymbol]]:
+        """
+        拼接上下文；启用 question_answer.context_char_budget 时按预算截断
+        
+        先计算每段头部长度，再一次性截取源码，避免拼接完整上下文后再回头截断。
+        预算耗尽后剩余符号不再进入上下文（也不作为可用证据），首个符号始终保留。
+        未配置预算（默认）时保留全部符号的完整源码。
+        
+        Returns:
+            (context, 实际进入上下文的符号列表)
+        """
+        budget = self.context_char_budget
+        if not isinstance(budget, int) or budget <= 0:
+            budget = None
+        
+        parts = []
+        included = []
+        used = 0
+        for s in symbols:
+            header = f"// File: {normalize_path_separators(s.file_path)}\n// Method: {s.qualified_name}\n"
+            source = s.source
+            if budget is not None:
+                marker = self.context_truncation_marker
+                remaining = budget - used - len(header) - (2 if parts else 0)
+                if remaining <= len(marker) and parts:
+                    break
+                if len(source) > remaining:
+                    keep = max(remaining - len(marker), 0)
+                    source = source[:keep] + marker
+                used += len(header) + len(source) + (2 if parts else 0)
+            parts.append(header + source)
+            included.append(s)
+        
+        return "\n\n".join(parts), included
+
+    @property
+    def _last_evidence_autofill(self) -> bool:
+        return getattr(self._local, "evidence_autofill", False)
+
+    @_last_evidence_autofill.setter
+    def _last_evidence_autofill(self, value: bool) -> None:
+        self._local.evidence_autofill = value
+
     def _sample_negative_type(self) -> Optional[str]:
         return sample_negative_type(
             self.coverage_cfg.negative_ratio,
@@ -309,6 +401,13 @@ class AnswerGenerator(BaseGenerator):
         if not raw_refs or not isinstance(raw_refs, list):
             raw_refs = []
 
+        # 归一化 ID / 去行号前缀索引只建一次，各 ref 直接查表（同键保留首个符号）
+        id_index, prefix_index = {}, {}
+        for s in symbols:
+            s_norm_id = normalize_path_separators(s.symbol_id)
+            id_index.setdefault(s_norm_id, s)
+            prefix_index.setdefault(s_norm_id.rsplit(':', 1)[0], s)
+
         for ref in raw_refs:
             # Handle string input (symbol_id only)
             if isinstance(ref, str):
@@ -319,27 +418,15 @@ class AnswerGenerator(BaseGenerator):
                 
             # Try to find exact or fuzzy match in symbols
             ref_id = ref.get('symbol_id', '')
-            best_match = None
             
             # 1. Exact match (normalized)
-            norm_ref_id = normalize_path_separators(ref_id)
-            for s in symbols:
-                if normalize_path_separators(s.symbol_id) == norm_ref_id:
-                    best_match = s
-                    break
+            best_match = id_index.get(normalize_path_separators(ref_id))
             
             # 2. Fuzzy match (ignore line number suffix)
             if not best_match and ':' in ref_id:
                 # Remove line number suffix from ref
                 ref_prefix = ref_id.rsplit(':', 1)[0]
-                norm_prefix = normalize_path_separators(ref_prefix)
-                
-                for s in symbols:
-                    s_norm_id = normalize_path_separators(s.symbol_id)
-                    s_prefix = s_norm_id.rsplit(':', 1)[0]
-                    if s_prefix == norm_prefix:
-                        best_match = s
-                        break
+                best_match = prefix_index.get(normalize_path_separators(ref_prefix))
             
             # Apply correction if match found
             if best_match:
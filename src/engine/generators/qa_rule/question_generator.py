@@ -239,40 +239,43 @@ class QuestionGenerator(BaseGenerator):
             # 粗略限制处理的 profile 数量以节省时间，但考虑到去重，这里不切片太死
             pass
 
-        for i, profile in enumerate(profiles, 1):
-            if self.max_questions and self.stats['total_questions'] >= self.max_questions:
-                logger.info(f"Reached max_questions limit ({self.max_questions}). Stopping.")
-                break
+        # 输出句柄只打开一次，逐条写入并 flush（中断时已生成的问题不丢失）
+        with open(self.output_jsonl, 'ab') as out_f:
+            for i, profile in enumerate(profiles, 1):
+                if self.max_questions and self.stats['total_questions'] >= self.max_questions:
+                    logger.info(f"Reached max_questions limit ({self.max_questions}). Stopping.")
+                    break
                 
-            logger.info(f"[{i}/{len(profiles)}] Generating questions for: {profile.qualified_name}")
+                logger.info(f"[{i}/{len(profiles)}] Generating questions for: {profile.qualified_name}")
             
-            try:
-                # 获取关联源码
-                symbol = symbols_map.get(normalize_path_separators(profile.symbol_id))
-                if not symbol:
-                    continue
+                try:
+                    # 获取关联源码
+                    symbol = symbols_map.get(normalize_path_separators(profile.symbol_id))
+                    if not symbol:
+                        continue
                 
-                # A. 调用生成
-                new_questions = self._generate_questions(profile, symbol)
+                    # A. 调用生成
+                    new_questions = self._generate_questions(profile, symbol)
                 
-                # B. 去重与过滤
-                for q in new_questions:
-                    if self.max_questions and self.stats['total_questions'] >= self.max_questions:
-                        break
+                    # B. 去重与过滤
+                    for q in new_questions:
+                        if self.max_questions and self.stats['total_questions'] >= self.max_questions:
+                            break
                     
-                    q_hash = simple_hash(q.question)
-                    if q_hash not in question_hashes:
-                        question_hashes.add(q_hash)
-                        all_questions.append(q)
+                        q_hash = simple_hash(q.question)
+                        if q_hash not in question_hashes:
+                            question_hashes.add(q_hash)
+                            all_questions.append(q)
                         
-                        # C. 实时持久化
-                        append_jsonl(self.output_jsonl, json.loads(q.model_dump_json()))
-                        self.stats['total_questions'] += 1
-                    else:
-                        self.stats['duplicates_removed'] += 1
+                            # C. 实时持久化
+                            out_f.write(q.model_dump_json().encode('utf-8') + b'\n')
+                            out_f.flush()
+                            self.stats['total_questions'] += 1
+                        else:
+                            self.stats['duplicates_removed'] += 1
                         
-            except Exception as e:
-                logger.error(f"Failed to generate questions for {profile.symbol_id}: {e}")
+                except Exception as e:
+                    logger.error(f"Failed to generate questions for {profile.symbol_id}: {e}")
                 
         return all_questions
 
@@ -307,7 +310,7 @@ class QuestionGenerator(BaseGenerator):
         user_prompt = self._build_composed_user_prompt(
             template_name,
             method_profile=profile.model_dump_json(indent=2),
-            source_code=symbol.source,
+            source_code=self._prepare_prompt_source(symbol),
             questions_per_method=self.questions_per_method,
             symbol_id=normalize_path_separators(profile.symbol_id),
             file_path=normalize_path_separators(profile.file_path),
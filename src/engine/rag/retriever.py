@@ -1,3 +1,5 @@
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict
 
@@ -6,7 +8,7 @@ from src.utils.core.config import Config
 from src.utils.core.logger import get_logger
 from src.utils.retrieval import vector_index
 from src.utils.retrieval.call_chain import expand_call_chain
-from src.utils.retrieval.keyword import keyword_search
+from src.utils.retrieval.keyword import KeywordIndex, keyword_search
 
 logger = get_logger(__name__)
 
@@ -20,6 +22,9 @@ class Retriever:
     3. 保证上下文在架构层级上的代表性 (Layer Balancing)
     """
     
+    # 需要在上下文中保证出现的架构层级（按补齐顺序）
+    BALANCED_LAYERS = ('controller', 'service', 'repository')
+    
     def __init__(self, config: Config, profile):
         """
         初始化检索器
@@ -35,6 +40,15 @@ class Retriever:
         self.top_k = self.config.get('core.retrieval_top_k', 6)
         self.max_context_chars = self.config.get('core.max_context_chars', 16000)
         
+        # 层级平衡缓存：同一份全量候选列表上的层级过滤结果与层内关键词检索结果
+        # （值中保留候选列表引用，列表更换时自动失效）
+        self._layer_candidates_cache: Dict[str, Tuple[List[CodeSymbol], List[CodeSymbol]]] = {}
+        self._layer_search_cache: "OrderedDict[Tuple[str, str], Tuple[List[CodeSymbol], List[CodeSymbol]]]" = OrderedDict()
+        self._layer_search_cache_size = 512
+        # 关键词检索索引：按全量候选列表构建一次，之后只读（列表更换时重建）
+        self._keyword_index: Optional[KeywordIndex] = None
+        self._cache_lock = threading.Lock()
+        
         # 向量索引路径
         self.embeddings_path = Path(self.config.get(
             'artifacts.method_embeddings_jsonl',
@@ -80,11 +94,13 @@ class Retriever:
         else:
             logger.warning(f"Embeddings file missing: {self.embeddings_path}. Falling back to keyword search.")
             # Use Keyword Search (BM25-lite) as fallback
+            keyword_index = self._get_keyword_index(symbols)
             retrieved_symbols = keyword_search(
                 query=query,
                 symbols=symbols,
                 top_k=k,
-                language_profile=getattr(self.profile, "data", None)
+                language_profile=keyword_index.language_profile,
+                index=keyword_index
             )
             
             # Final safety net: if keyword search fails (empty query?), fallback to first k
@@ -122,34 +138,83 @@ class Retriever:
         """
         保证检索结果中包含 Controller, Service, Repository 等关键层级
         """
-        # 统计当前选集中已有的层级
-        layers_coverage = {'controller': 0, 'service': 0, 'repository': 0}
+        # 单遍统计当前选集已覆盖的层级，三层齐全即提前结束
+        covered = set()
         for s in selected:
             layer_type = self.profile.get_layer(s)
-            if layer_type in layers_coverage:
-                layers_coverage[layer_type] += 1
+            if layer_type in self.BALANCED_LAYERS:
+                covered.add(layer_type)
+                if len(covered) == len(self.BALANCED_LAYERS):
+                    break
         
+        missing_layers = [layer for layer in self.BALANCED_LAYERS if layer not in covered]
         balanced = list(selected)
+        if not missing_layers:
+            return balanced
+        
         seen_ids = {s.symbol_id for s in balanced}
         
         # 如果某个层级缺失，从全量候选集中寻找该层级的代表
-        for layer_name, count in layers_coverage.items():
-            if count == 0:
-                layer_candidates = self.profile.filter_by_layer(all_candidates, layer_name)
-                if layer_candidates:
-                    # 使用 Keyword Search 在该层级中找到最相关的一个 (而不是直接取第一个)
-                    best_candidates = keyword_search(
-                        query=query,
-                        symbols=layer_candidates,
-                        top_k=1,
-                        language_profile=getattr(self.profile, "data", None)
-                    )
-                    
-                    candidate = best_candidates[0] if best_candidates else layer_candidates[0]
-                    
-                    if candidate.symbol_id not in seen_ids:
-                        balanced.append(candidate)
-                        seen_ids.add(candidate.symbol_id)
-                        logger.debug(f"Balanced addition: {candidate.symbol_id} as {layer_name}")
+        for layer_name in missing_layers:
+            layer_candidates = self._get_layer_candidates(all_candidates, layer_name)
+            if layer_candidates:
+                # 使用 Keyword Search 在该层级中找到最相关的一个 (而不是直接取第一个)
+                best_candidates = self._search_layer(query, layer_name, all_candidates, layer_candidates)
+                
+                candidate = best_candidates[0] if best_candidates else layer_candidates[0]
+                
+                if candidate.symbol_id not in seen_ids:
+                    balanced.append(candidate)
+                    seen_ids.add(candidate.symbol_id)
+                    logger.debug(f"Balanced addition: {candidate.symbol_id} as {layer_name}")
                         
         return balanced
+
+    def _get_keyword_index(self, all_candidates: List[CodeSymbol]) -> KeywordIndex:
+        """全量候选列表的关键词索引（每份列表只构建一次，构建后只读，可跨线程共享）"""
+        with self._cache_lock:
+            index = self._keyword_index
+            if index is None or index.symbols is not all_candidates:
+                index = KeywordIndex(all_candidates, getattr(self.profile, "data", None))
+                self._keyword_index = index
+            return index
+
+    def _get_layer_candidates(self, all_candidates: List[CodeSymbol], layer_name: str) -> List[CodeSymbol]:
+        """某层级的候选符号（同一份全量候选列表只过滤一次）"""
+        cached = self._layer_candidates_cache.get(layer_name)
+        if cached is not None and cached[0] is all_candidates:
+            return cached[1]
+        layer_candidates = self.profile.filter_by_layer(all_candidates, layer_name)
+        self._layer_candidates_cache[layer_name] = (all_candidates, layer_candidates)
+        return layer_candidates
+
+    def _search_layer(
+        self,
+        query: str,
+        layer_name: str,
+        all_candidates: List[CodeSymbol],
+        layer_candidates: List[CodeSymbol]
+    ) -> List[CodeSymbol]:
+        """层内 top-1 关键词检索（按 query/层级做 LRU 缓存，相同问题不重复打分）"""
+        key = (query, layer_name)
+        with self._cache_lock:
+            cached = self._layer_search_cache.get(key)
+            if cached is not None and cached[0] is all_candidates:
+                self._layer_search_cache.move_to_end(key)
+                return cached[1]
+        
+        keyword_index = self._get_keyword_index(all_candidates)
+        result = keyword_search(
+            query=query,
+            symbols=layer_candidates,
+            top_k=1,
+            language_profile=keyword_index.language_profile,
+            index=keyword_index
+        )
+        
+        with self._cache_lock:
+            self._layer_search_cache[key] = (all_candidates, result)
+            self._layer_search_cache.move_to_end(key)
+            while len(self._layer_search_cache) > self._layer_search_cache_size:
+                self._layer_search_cache.popitem(last=False)
+        return result
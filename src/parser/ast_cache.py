@@ -0,0 +1,92 @@
+"""
+解析结果缓存 - 按文件内容哈希持久化已提取的符号
+
+同一文件内容在相同解析设置下总是产出相同的符号，命中缓存时可跳过
+tree-sitter 解析与语法树遍历，增量重跑只剩读文件 + 计算哈希的开销。
+"""
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from src.schemas import CodeSymbol
+from src.utils.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SymbolCache:
+    """
+    SQLite 持久化的 文件 -> 符号列表 缓存
+
+    一行对应一个源文件（以仓库相对路径为主键），记录内容 SHA-256 与解析设置签名；
+    两者都一致时才视为命中。repo_commit 不参与缓存键，由调用方在命中后重新标记。
+    """
+
+    def __init__(self, db_path: Path | str, signature: str):
+        """
+        Args:
+            db_path: SQLite 文件路径（父目录自动创建）
+            signature: 解析设置签名（解析器版本、截断长度等影响输出的参数）
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.signature = signature
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_symbols ("
+            " path TEXT PRIMARY KEY,"
+            " sha256 BLOB NOT NULL,"
+            " signature TEXT NOT NULL,"
+            " symbols_json BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._in_batch = False
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, digest: bytes) -> list[CodeSymbol] | None:
+        """查询缓存，未命中（或内容/设置已变化）时返回 None"""
+        row = self._conn.execute(
+            "SELECT symbols_json FROM file_symbols WHERE path = ? AND sha256 = ? AND signature = ?",
+            (path, digest, self.signature)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [CodeSymbol.model_validate_json(line) for line in bytes(row[0]).splitlines() if line]
+
+    def put(self, path: str, digest: bytes, symbols: list[CodeSymbol]) -> None:
+        """写入（覆盖）一个文件的符号列表；批量模式下延迟到 batch 结束时统一提交"""
+        payload = b"\n".join(s.model_dump_json().encode('utf-8') for s in symbols)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO file_symbols (path, sha256, signature, symbols_json) VALUES (?, ?, ?, ?)",
+            (path, digest, self.signature, payload)
+        )
+        if not self._in_batch:
+            self._conn.commit()
+
+    @contextmanager
+    def batch(self) -> Iterator["SymbolCache"]:
+        """在一个事务内完成整轮解析的写入"""
+        self._in_batch = True
+        try:
+            yield self
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        finally:
+            self._in_batch = False
+
+    def close(self) -> None:
+        """提交未完成的写入并关闭连接"""
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self) -> "SymbolCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
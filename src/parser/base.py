@@ -1,11 +1,15 @@
 ﻿"""
 Parser 抽象基类 - 定义代码解析器的统一接口
 """
+import os
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Generator
 
 from src.schemas import CodeSymbol, ParsingReport
+from src.utils.core.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class BaseParser(ABC):
@@ -14,6 +18,10 @@ class BaseParser(ABC):
     所有具体的语言解析器（如 JavaParser）都应继承此类并实现抽象方法
     """
 
+    # 进程池每批发送的文件数上下限（见 _pool_chunksize）
+    MIN_POOL_CHUNK = 8
+    MAX_POOL_CHUNK = 64
+
     def __init__(self, config: dict | None = None):
         """
         初始化解析器
@@ -37,6 +45,14 @@ class BaseParser(ABC):
         self.file_extensions = parsing_config.get('file_extensions', [])
         self.include_private = parsing_config.get('include_private', False)
         self.include_test = parsing_config.get('include_test', False)
+        # 解析结果缓存（SQLite，按文件内容哈希）；为空时不启用
+        self.symbol_cache_path = parsing_config.get('symbol_cache_path')
+        # 进程内保留上一次的语法树，同一文件再次解析时做增量解析（常驻/多次解析场景）
+        self.incremental_reparse = parsing_config.get('incremental_reparse', False)
+        # 并行解析的进程数（1 = 顺序解析，<=0 = 使用全部 CPU）
+        self.parse_workers = parsing_config.get('workers', 1)
+        # 跳过带生成标记（@Generated / "Generated by" 等）的源文件
+        self.skip_generated = parsing_config.get('skip_generated', False)
         
         # Allow config file to override (for project-specific customization)
         # Handle both dict and Config object
@@ -47,11 +63,22 @@ class BaseParser(ABC):
             self.max_chars_per_symbol = parsing_override.get('max_chars_per_symbol', self.max_chars_per_symbol)
             self.include_private = parsing_override.get('include_private', self.include_private)
             self.include_test = parsing_override.get('include_test', self.include_test)
+            self.symbol_cache_path = parsing_override.get('symbol_cache_path', self.symbol_cache_path)
+            self.incremental_reparse = parsing_override.get('incremental_reparse', self.incremental_reparse)
+            self.parse_workers = parsing_override.get('workers', self.parse_workers)
+            self.skip_generated = parsing_override.get('skip_generated', self.skip_generated)
             if 'ignore_paths' in parsing_override:
                 # Merge ignore paths (profile + override)
                 self.ignore_paths = list(set(self.ignore_paths + parsing_override['ignore_paths']))
             if 'file_extensions' in parsing_override:
                 self.file_extensions = parsing_override['file_extensions']
+        
+        self.parse_workers = int(self.parse_workers if self.parse_workers is not None else 1)
+        if self.parse_workers <= 0:
+            self.parse_workers = os.cpu_count() or 1
+        
+        # 预处理忽略规则（去重、剔除被更短规则覆盖的冗余项），should_ignore 每个文件都会调用
+        self._ignore_patterns = self._compile_ignore_patterns(self.ignore_paths)
 
     @abstractmethod
     def parse_repo(self, repo_path: str, repo_commit: str) -> list[CodeSymbol]:
@@ -93,11 +120,39 @@ class BaseParser(ABC):
         Returns:
             bool: True 表示应忽略
         """
-        path_str = path.as_posix()
-        for pattern in self.ignore_paths:
+        return self._is_ignored_posix(path.as_posix())
+    
+    def _is_ignored_posix(self, path_str: str) -> bool:
+        """should_ignore 的字符串版本（path_str 为 / 分隔的路径），遍历目录时省去构造 Path"""
+        for pattern in self._ignore_patterns:
             if pattern in path_str:
                 return True
         return False
+    
+    @staticmethod
+    def _compile_ignore_patterns(ignore_paths: list[str]) -> tuple[str, ...]:
+        """
+        整理忽略规则（子串匹配语义）
+        
+        若规则 A 是规则 B 的子串，则命中 B 的路径必然命中 A，B 可以省去
+        （如 "test" 覆盖 "tests"）；短规则排在前面，尽早命中。
+        """
+        unique = sorted(set(ignore_paths), key=lambda p: (len(p), p))
+        patterns: list[str] = []
+        for pattern in unique:
+            if not any(kept in pattern for kept in patterns):
+                patterns.append(pattern)
+        return tuple(patterns)
+
+    def _pool_chunksize(self, n_jobs: int) -> int:
+        """
+        进程池每批发送给 worker 的文件数
+        
+        按每个 worker 约分到 4 批计算：文件多时批次更大，摊薄逐批的 IPC/pickle 往返；
+        同时保留几批余量，避免个别大文件拖住整批导致负载不均。
+        """
+        chunksize = n_jobs // (self.parse_workers * 4)
+        return max(self.MIN_POOL_CHUNK, min(self.MAX_POOL_CHUNK, chunksize))
 
     def truncate_source(self, source: str) -> str:
         """
@@ -137,9 +192,11 @@ class BaseParser(ABC):
             ParsingReport: 解析报告对象
         """
         from collections import Counter
+        from operator import attrgetter
         
-        symbols_by_type = Counter(s.symbol_type for s in symbols)
-        files = {s.file_path for s in symbols}
+        # map + attrgetter 让属性读取与计数都留在 C 层（比单循环里逐个 Counter[...] += 1 更快）
+        symbols_by_type = Counter(map(attrgetter('symbol_type'), symbols))
+        files = set(map(attrgetter('file_path'), symbols))
         
         return ParsingReport(
             repo_path=str(repo_path),
@@ -164,3 +221,58 @@ class BaseParser(ABC):
             Path: 源码文件路径
         """
         raise NotImplementedError("Subclass should implement iter_source_files()")
+
+    def _iter_source_entries(self, repo_path: Path) -> Generator[tuple[Path, str], None, None]:
+        """
+        迭代 (源文件, 仓库相对路径)
+        
+        基于 os.scandir 的先序遍历（顺序与 rglob 一致）：命中忽略规则的目录整棵跳过，
+        不再进入 target/、.git/、node_modules/ 等目录逐个 stat 文件；
+        相对路径直接由字符串前缀得到，不再逐个调用 Path.relative_to
+        """
+        # Remove leading dot if present
+        suffixes = tuple(ext if ext.startswith('.') else f".{ext}" for ext in self.file_extensions)
+        if not suffixes:
+            return
+        
+        root = os.fspath(Path(repo_path))
+        prefix_len = len(os.path.join(root, ''))
+        # 忽略规则匹配的是 Path.as_posix() 形式：根目录为 "." 时 Path 会去掉 "./" 前缀
+        ignore_offset = prefix_len if root == os.curdir else 0
+        
+        def is_ignored(entry_path: str) -> bool:
+            path_str = entry_path[ignore_offset:]
+            if os.sep != '/':
+                path_str = path_str.replace(os.sep, '/')
+            return self._is_ignored_posix(path_str)
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = list(it)
+            except OSError as e:
+                logger.debug(f"Cannot scan directory {current}: {e}")
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    # 忽略规则是路径子串匹配：目录命中则其下所有文件必然命中
+                    if is_ignored(entry.path):
+                        logger.debug(f"Ignoring directory: {entry.path}")
+                    else:
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(suffixes) and entry.is_file():
+                    # 检查是否应该忽略
+                    if is_ignored(entry.path):
+                        logger.debug(f"Ignoring file: {entry.path}")
+                        continue
+                    source_file = Path(entry.path)
+                    relative_path = entry.path[prefix_len:]
+                    if os.sep != '/':
+                        relative_path = relative_path.replace(os.sep, '/')
+                    yield source_file, relative_path
+            
+            # 逆序入栈，保证按 scandir 顺序先序遍历
+            stack.extend(reversed(subdirs))
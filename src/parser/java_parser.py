@@ -1,20 +1,34 @@
 ﻿"""
 Java 解析器 - 使用 tree-sitter 解析 Java 代码
 """
+import hashlib
 import json
+import sys
 import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from importlib import metadata
 from pathlib import Path
-from typing import Generator
+from typing import ClassVar, Generator, Iterable, Iterator
 
 import tree_sitter_java as tsjava
-from tree_sitter import Language, Parser, Node
+from pydantic import TypeAdapter
+from tree_sitter import Language, Parser, Node, Query, Tree
 
+from src.parser.ast_cache import SymbolCache
 from src.parser.base import BaseParser
-from src.schemas import CodeSymbol, Annotation, ParsingReport, sha256_text
+from src.schemas import CodeSymbol, Annotation, ParsingReport, sha256_bytes, sha256_text
+from src.utils.core.config import Config as ConfigClass
 from src.utils.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 复用同一个序列化器写 symbols.jsonl / 解析报告（直接产出 bytes）
+_SYMBOL_ADAPTER = TypeAdapter(CodeSymbol)
+_REPORT_ADAPTER = TypeAdapter(ParsingReport)
+
 
 class JavaParser(BaseParser):
     """
@@ -28,34 +42,98 @@ class JavaParser(BaseParser):
     - JavaDoc 注释
     """
     
-    # Spring 常见注解列表
-    SPRING_ANNOTATIONS = {
+    # Spring 常见注解列表（frozenset：不可变，可安全地在进程间共享）
+    SPRING_ANNOTATIONS = frozenset({
         'RestController', 'Controller', 'Service', 'Repository', 'Component',
         'Configuration', 'Bean', 'Autowired', 'Value', 'Qualifier',
         'GetMapping', 'PostMapping', 'PutMapping', 'DeleteMapping', 'RequestMapping',
         'PathVariable', 'RequestParam', 'RequestBody', 'ResponseBody',
         'Transactional', 'Async', 'Scheduled', 'EnableAsync',
         'SpringBootApplication', 'ComponentScan', 'EnableAutoConfiguration'
-    }
+    })
+    
+    # 符号提取逻辑变化（会改变同一文件的输出）时递增，使旧的解析缓存失效
+    SYMBOL_CACHE_VERSION = 5
+    
+    # incremental_reparse 保留的语法树数量（LRU；每项持有整文件源码与语法树）
+    TREE_CACHE_SIZE = 64
+    
+    # 快速预过滤：只有类体（class_body）中的方法会产出符号，源码里没有 class 关键字的文件
+    # （package-info.java、纯接口/枚举/注解定义等）不可能产出符号，无需 tree-sitter 解析
+    SYMBOL_KEYWORDS = (b'class',)
+    
+    # 生成代码标记（skip_generated 开启时只检查文件头部）
+    GENERATED_MARKERS = (b'@Generated', b'.Generated(', b'// Generated by', b'DO NOT EDIT')
+    GENERATED_SCAN_BYTES = 2048
+    
+    # tree-sitter 语法与预编译查询（_load_language 首次调用时填充，进程内共享）
+    java_language: ClassVar[Language | None] = None
+    _class_query: ClassVar[Query]
+    _package_query: ClassVar[Query]
+    _modifiers_kind_ids: ClassVar[frozenset[int]]
+    _annotation_kind_ids: ClassVar[frozenset[int]]
     
     def __init__(self, config: dict | None = None):
         """初始化 Java 解析器"""
         super().__init__(config)
         
-        # 初始化 tree-sitter
-        # Language 需要两个参数：language() 返回值和语言名称
-        self.java_language = Language(tsjava.language(), "java")
-        self.parser = Parser()
-        self.parser.set_language(self.java_language)
+        # 初始化 tree-sitter：语法与预编译查询在进程内所有实例间共享，Parser 首次使用时创建
+        self._load_language()
+        self._parser: Parser | None = None
         
         # 解析跳过记录路径
         self.skip_log_path = Path('data/raw/extracted/parse_skipped.jsonl')
         self.skip_log_path.parent.mkdir(parents=True, exist_ok=True)
+        # 跳过记录先缓存在内存中，parse_repo 结束时一次性追加写入
+        self._skip_buffer: list[dict] = []
+        
+        # 解析结果缓存（仅在 parse_repo 期间打开）
+        self._symbol_cache: SymbolCache | None = None
+        # 增量解析：relative_path -> (上次解析的源码 bytes, 语法树)，仅 incremental_reparse 开启时写入
+        self._tree_cache: "OrderedDict[str, tuple[bytes, Tree]]" = OrderedDict()
         
         logger.info(f"JavaParser initialized with max_chars_per_symbol={self.max_chars_per_symbol}")
         logger.info(f"File extensions: {self.file_extensions}")
         logger.info(f"Ignore paths: {len(self.ignore_paths)} patterns")
     
+    @classmethod
+    def _load_language(cls) -> None:
+        """加载 Java 语法并预编译查询（每个进程只执行一次，结果挂在类属性上）"""
+        if cls.java_language is not None:
+            return
+        # Language 需要两个参数：language() 返回值和语言名称
+        language = Language(tsjava.language(), "java")
+        
+        # 预编译查询：在 C 端一次性匹配整棵语法树，替代 Python 递归遍历
+        # 结果按节点在源码中的位置排序（与先序遍历顺序一致）
+        cls._class_query = language.query(
+            "[(class_declaration) (interface_declaration) (enum_declaration)] @class"
+        )
+        cls._package_query = language.query(
+            "(package_declaration [(scoped_identifier) (identifier)] @name)"
+        )
+        # 注解提取按整数 kind_id 判断节点类型（避免每个节点都构造 type 字符串）
+        cls._modifiers_kind_ids = cls._kind_ids(language, 'modifiers')
+        cls._annotation_kind_ids = cls._kind_ids(language, 'marker_annotation', 'annotation')
+        cls.java_language = language
+    
+    @property
+    def parser(self) -> Parser:
+        """tree-sitter Parser（按实例懒加载：Parser 有内部状态，不在实例间共享）"""
+        if self._parser is None:
+            self._parser = Parser()
+            self._parser.set_language(self.java_language)
+        return self._parser
+    
+    @staticmethod
+    def _kind_ids(language: Language, *kinds: str) -> frozenset[int]:
+        """命名节点类型 -> kind_id 集合（同名别名可能对应多个 id）"""
+        # 注：当前 tree-sitter 版本的 Language.id_for_node_kind 会崩溃，这里反向枚举
+        return frozenset(
+            kind_id for kind_id in range(language.node_kind_count)
+            if language.node_kind_is_named(kind_id) and language.node_kind_for_id(kind_id) in kinds
+        )
+    
     def parse_repo(self, repo_path: str, repo_commit: str) -> list[CodeSymbol]:
         """
         解析整个 Java 代码仓库
@@ -80,26 +158,35 @@ class JavaParser(BaseParser):
         parsed_files = 0
         failed_files = 0
         
-        # 遍历所有源文件（根据 profile 的 file_extensions）
-        for java_file in self.iter_source_files(repo_path_obj):
-            try:
-                # 解析单个文件
-                file_symbols = self.parse_file(java_file, repo_commit, repo_path_obj)
-                symbols.extend(file_symbols)
-                parsed_files += 1
+        # 缓存写入在一个事务内完成，解析结束后关闭连接（下次解析重新打开）
+        cache = self._open_symbol_cache()
+        try:
+            with cache.batch() if cache is not None else nullcontext():
+                # 遍历所有源文件（根据 profile 的 file_extensions），相对路径在遍历时一并算出
+                source_files = list(self._iter_source_entries(repo_path_obj))
+                logger.info(f"Found {len(source_files)} source files")
+                if self.parse_workers > 1:
+                    results = self._parse_files_parallel(source_files, repo_commit)
+                else:
+                    results = self._parse_files_sequential(source_files, repo_commit)
                 
-                if parsed_files % 10 == 0:
-                    logger.info(f"Parsed {parsed_files} files, {len(symbols)} symbols so far")
+                for java_file, file_symbols, error_info in results:
+                    if error_info is None:
+                        symbols.extend(file_symbols)
+                        parsed_files += 1
                     
-            except Exception as e:
-                failed_files += 1
-                error_info = {
-                    'file': str(java_file),
-                    'error': str(e),
-                    'type': type(e).__name__
-                }
-                errors.append(error_info)
-                logger.error(f"Failed to parse {java_file}: {e}")
+                        if parsed_files % 10 == 0:
+                            logger.info(f"Parsed {parsed_files} files, {len(symbols)} symbols so far")
+                    else:
+                        failed_files += 1
+                        errors.append(error_info)
+                        logger.error(f"Failed to parse {java_file}: {error_info['error']}")
+        finally:
+            self._flush_skipped()
+            self._close_symbol_cache()
+        
+        if cache is not None:
+            logger.info(f"Symbol cache: {cache.hits} hits, {cache.misses} misses ({cache.db_path})")
         
         # 生成报告
         parsing_time = time.time() - start_time
@@ -118,7 +205,69 @@ class JavaParser(BaseParser):
         
         return symbols
     
-    def parse_file(self, file_path: Path, repo_commit: str, repo_root: Path | None = None) -> list[CodeSymbol]:
+    def _parse_files_sequential(
+        self, files: Iterable[tuple[Path, str]], repo_commit: str
+    ) -> Iterator[tuple[Path, list[CodeSymbol] | None, dict | None]]:
+        """逐个解析 (文件, 相对路径)，产出 (文件, 符号列表, 错误信息)"""
+        for java_file, relative_path in files:
+            try:
+                yield java_file, self.parse_file(java_file, repo_commit, relative_path=relative_path), None
+            except Exception as e:
+                yield java_file, None, _error_info(java_file, e)
+    
+    def _parse_files_parallel(
+        self, files: list[tuple[Path, str]], repo_commit: str
+    ) -> Iterator[tuple[Path, list[CodeSymbol] | None, dict | None]]:
+        """
+        多进程解析：缓存查询/写入留在主进程，只把未命中的文件分发给工作进程；
+        结果按文件顺序产出，与顺序解析一致
+        """
+        results: list[tuple[list[CodeSymbol] | None, dict | None] | None] = [None] * len(files)
+        jobs = []  # (index, relative_path, digest)
+        for i, (java_file, relative_path) in enumerate(files):
+            try:
+                raw_bytes = java_file.read_bytes()
+                if self._should_skip_source(raw_bytes, java_file):
+                    results[i] = ([], None)
+                    continue
+                digest, cached_symbols = self._lookup_symbol_cache(raw_bytes, relative_path, repo_commit)
+            except Exception as e:
+                results[i] = (None, _error_info(java_file, e))
+                continue
+            if cached_symbols is not None:
+                results[i] = (cached_symbols, None)
+            else:
+                jobs.append((i, relative_path, digest))
+        
+        if jobs:
+            logger.info(f"Parsing {len(jobs)} files with {self.parse_workers} worker processes")
+            config_dict = self.config._config if isinstance(self.config, ConfigClass) else self.config
+            with ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                initializer=_init_parse_worker,
+                initargs=(config_dict,)
+            ) as executor:
+                outcomes = executor.map(
+                    _parse_in_worker,
+                    [(str(files[i][0]), relative_path, repo_commit) for i, relative_path, _ in jobs],
+                    chunksize=self._pool_chunksize(len(jobs))
+                )
+                for (i, relative_path, digest), (file_symbols, error_info, skipped) in zip(jobs, outcomes):
+                    self._skip_buffer.extend(skipped)
+                    if error_info is None and digest is not None:
+                        self._symbol_cache.put(relative_path, digest, file_symbols)
+                    results[i] = (file_symbols, error_info)
+        
+        for (java_file, _), (file_symbols, error_info) in zip(files, results):
+            yield java_file, file_symbols, error_info
+    
+    def parse_file(
+        self,
+        file_path: Path,
+        repo_commit: str,
+        repo_root: Path | None = None,
+        relative_path: str | None = None
+    ) -> list[CodeSymbol]:
         """
         解析单个 Java 文件
         
@@ -126,42 +275,90 @@ class JavaParser(BaseParser):
             file_path: Java 文件路径
             repo_commit: 仓库 commit hash
             repo_root: 仓库根目录（用于计算相对路径）
+            relative_path: 已知的仓库相对路径（提供时不再根据 repo_root 计算）
             
         Returns:
             list[CodeSymbol]: 该文件中解析出的符号列表
         """
         # 读取文件内容
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source_code = f.read()
-        except UnicodeDecodeError:
-            # 尝试其他编码
-            with open(file_path, 'r', encoding='latin-1') as f:
-                source_code = f.read()
+        raw_bytes = file_path.read_bytes()
+        if self._should_skip_source(raw_bytes, file_path):
+            return []
+        if relative_path is None:
+            relative_path = self._relative_path(file_path, repo_root)
         
-        # 解析语法树
-        tree = self.parser.parse(bytes(source_code, 'utf-8'))
-        root_node = tree.root_node
+        # 内容未变化的文件直接复用缓存的符号（只需重新标记 repo_commit）
+        digest, cached_symbols = self._lookup_symbol_cache(raw_bytes, relative_path, repo_commit)
+        if cached_symbols is not None:
+            return cached_symbols
+        
+        symbols = self._extract_symbols(raw_bytes, relative_path, repo_commit)
         
-        # 计算相对路径
+        if digest is not None:
+            self._symbol_cache.put(relative_path, digest, symbols)
+        
+        return symbols
+    
+    def _should_skip_source(self, raw_bytes: bytes, file_path: Path) -> bool:
+        """字节级预过滤：判断文件能否跳过解析（bytes 子串查找在 C 中完成，代价可忽略）"""
+        if not any(keyword in raw_bytes for keyword in self.SYMBOL_KEYWORDS):
+            return True
+        if self.skip_generated:
+            head = raw_bytes[:self.GENERATED_SCAN_BYTES]
+            if any(marker in head for marker in self.GENERATED_MARKERS):
+                logger.debug(f"Skipping generated source: {file_path}")
+                return True
+        return False
+    
+    @staticmethod
+    def _relative_path(file_path: Path, repo_root: Path | None) -> str:
+        """计算仓库相对路径（无法计算时退化为文件名）"""
         if repo_root:
             try:
-                relative_path = file_path.relative_to(repo_root).as_posix()
+                return file_path.relative_to(repo_root).as_posix()
             except ValueError:
-                relative_path = file_path.name
-        else:
-            relative_path = file_path.name
+                return file_path.name
+        return file_path.name
+    
+    def _lookup_symbol_cache(
+        self, raw_bytes: bytes, relative_path: str, repo_commit: str
+    ) -> tuple[bytes | None, list[CodeSymbol] | None]:
+        """查询解析缓存，返回 (内容摘要, 命中的符号)；缓存未打开（未配置或不在 parse_repo 内）时摘要为 None"""
+        cache = self._symbol_cache
+        if cache is None:
+            return None, None
+        digest = hashlib.sha256(raw_bytes).digest()
+        cached_symbols = cache.get(relative_path, digest)
+        if cached_symbols is None:
+            return digest, None
+        return digest, [s.model_copy(update={'repo_commit': repo_commit}) for s in cached_symbols]
+    
+    def _extract_symbols(self, raw_bytes: bytes, relative_path: str, repo_commit: str) -> list[CodeSymbol]:
+        """解析文件内容并提取符号（不涉及缓存，可在工作进程中执行）"""
+        # 文件路径、类名、注解名等短字符串在大量符号间重复，统一 intern 只保留一份
+        relative_path = sys.intern(relative_path)
+        
+        # tree-sitter 的节点偏移是字节偏移：全程使用 UTF-8 字节，只在产出符号时解码短切片
+        source_bytes = self._to_utf8_bytes(raw_bytes)
+        
+        # 解析语法树
+        tree = self._parse_tree(relative_path, source_bytes)
+        root_node = tree.root_node
         
         # 提取 package 名称
-        package_name = self._extract_package(root_node, source_code)
+        package_name = self._extract_package(root_node, source_bytes)
+        
+        # 行起始偏移（整文件只算一次，供 JavaDoc 回溯按行取文本）
+        line_starts = self._compute_line_starts(source_bytes)
         
         symbols = []
         
         # 遍历所有类声明
-        for class_node in self._find_nodes_by_type(root_node, ['class_declaration', 'interface_declaration', 'enum_declaration']):
+        for class_node, _ in self._class_query.captures(root_node):
             class_symbols = self._parse_class(
                 class_node=class_node,
-                source_code=source_code,
+                source_bytes=source_bytes,
+                line_starts=line_starts,
                 file_path=relative_path,
                 package_name=package_name,
                 repo_commit=repo_commit
@@ -170,10 +367,91 @@ class JavaParser(BaseParser):
         
         return symbols
     
+    def _parse_tree(self, relative_path: str, source_bytes: bytes) -> Tree:
+        """
+        解析语法树；开启 incremental_reparse 时复用该文件上一次的语法树
+        （只保留最近 TREE_CACHE_SIZE 个文件，面向反复解析同一批文件的长期存活解析器）
+        
+        把新旧内容的差异（公共前缀/后缀之间的区间）作为一次 Tree.edit 提交给
+        tree-sitter，只重新解析改动区域。
+        """
+        if not self.incremental_reparse:
+            return self.parser.parse(source_bytes)
+        
+        previous = self._tree_cache.pop(relative_path, None)
+        if previous is None:
+            tree = self.parser.parse(source_bytes)
+        else:
+            old_bytes, old_tree = previous
+            if old_bytes == source_bytes:
+                self._tree_cache[relative_path] = previous
+                return old_tree
+            start, old_end, new_end = self._diff_span(old_bytes, source_bytes)
+            old_tree.edit(
+                start_byte=start,
+                old_end_byte=old_end,
+                new_end_byte=new_end,
+                start_point=self._byte_to_point(old_bytes, start),
+                old_end_point=self._byte_to_point(old_bytes, old_end),
+                new_end_point=self._byte_to_point(source_bytes, new_end),
+            )
+            tree = self.parser.parse(source_bytes, old_tree)
+        
+        self._tree_cache[relative_path] = (source_bytes, tree)
+        if len(self._tree_cache) > self.TREE_CACHE_SIZE:
+            self._tree_cache.popitem(last=False)
+        return tree
+    
+    @staticmethod
+    def _diff_span(old: bytes, new: bytes) -> tuple[int, int, int]:
+        """新旧内容唯一的改动区间：(start, old_end, new_end)"""
+        limit = min(len(old), len(new))
+        block = 4096  # 先按块比较（C 层 memcmp），再逐字节收尾
+        start = 0
+        while start + block <= limit and old[start:start + block] == new[start:start + block]:
+            start += block
+        while start < limit and old[start] == new[start]:
+            start += 1
+        suffix = 0
+        old_len, new_len = len(old), len(new)
+        while suffix + block <= limit - start and \
+                old[old_len - suffix - block:old_len - suffix] == new[new_len - suffix - block:new_len - suffix]:
+            suffix += block
+        while suffix < limit - start and old[-1 - suffix] == new[-1 - suffix]:
+            suffix += 1
+        return start, old_len - suffix, new_len - suffix
+    
+    @staticmethod
+    def _byte_to_point(data: bytes, offset: int) -> tuple[int, int]:
+        """字节偏移 -> tree-sitter 的 (row, column)（column 以字节计）"""
+        row = data.count(b'\n', 0, offset)
+        return row, offset - (data.rfind(b'\n', 0, offset) + 1)
+    
+    def _close_symbol_cache(self) -> None:
+        """关闭解析结果缓存连接"""
+        if self._symbol_cache is not None:
+            self._symbol_cache.close()
+            self._symbol_cache = None
+    
+    def _open_symbol_cache(self) -> SymbolCache | None:
+        """打开解析结果缓存（仅由 parse_repo 调用，结束时关闭）；未配置 symbol_cache_path 时返回 None"""
+        if self._symbol_cache is None and self.symbol_cache_path:
+            try:
+                ts_java_version = metadata.version('tree-sitter-java')
+            except metadata.PackageNotFoundError:
+                ts_java_version = 'unknown'
+            signature = (
+                f"java:v{self.SYMBOL_CACHE_VERSION}:tree-sitter-java={ts_java_version}"
+                f":max_chars={self.max_chars_per_symbol}"
+            )
+            self._symbol_cache = SymbolCache(self.symbol_cache_path, signature)
+        return self._symbol_cache
+    
     def _parse_class(
         self,
         class_node: Node,
-        source_code: str,
+        source_bytes: bytes,
+        line_starts: array,
         file_path: str,
         package_name: str,
         repo_commit: str
@@ -182,28 +460,29 @@ class JavaParser(BaseParser):
         symbols = []
         
         # 获取类名
-        class_name = self._get_class_name(class_node, source_code)
+        class_name = self._get_class_name(class_node, source_bytes)
         if not class_name:
             return symbols
         
         # 构建完全限定名
         if package_name:
-            qualified_class_name = f"{package_name}.{class_name}"
+            qualified_class_name = sys.intern(f"{package_name}.{class_name}")
         else:
-            qualified_class_name = class_name
+            qualified_class_name = sys.intern(class_name)
         
         # 解析类上的注解
-        class_annotations = self._extract_annotations(class_node, source_code)
+        class_annotations, _ = self._extract_annotations(class_node, source_bytes)
         
         # 解析类的 JavaDoc
-        class_doc = self._extract_javadoc(class_node, source_code)
+        class_doc = self._extract_javadoc(class_node, source_bytes, line_starts)
         
         # 遍历类的方法
         for method_node in self._find_methods_in_class(class_node):
             try:
                 method_symbol = self._parse_method(
                     method_node=method_node,
-                    source_code=source_code,
+                    source_bytes=source_bytes,
+                    line_starts=line_starts,
                     file_path=file_path,
                     class_qualified_name=qualified_class_name,
                     repo_commit=repo_commit
@@ -219,34 +498,36 @@ class JavaParser(BaseParser):
     def _parse_method(
         self,
         method_node: Node,
-        source_code: str,
+        source_bytes: bytes,
+        line_starts: array,
         file_path: str,
         class_qualified_name: str,
         repo_commit: str
     ) -> CodeSymbol | None:
         """解析单个方法"""
         # 获取方法名
-        method_name = self._get_method_name(method_node, source_code)
+        method_name = self._get_method_name(method_node, source_bytes)
         if not method_name:
             return None
+        # get/set/toString 等方法名大量重复
+        method_name = sys.intern(method_name)
         
         # 构建完全限定名
         qualified_name = f"{class_qualified_name}.{method_name}"
         
-        # 提取方法源码
-        start_byte = method_node.start_byte
-        end_byte = method_node.end_byte
-        method_source = source_code[start_byte:end_byte]
+        # 提取方法源码（memoryview 切片不复制字节，直接解码/计算哈希）
+        method_bytes = memoryview(source_bytes)[method_node.start_byte:method_node.end_byte]
+        method_source = str(method_bytes, 'utf-8', 'replace')
         
         # 计算行号（tree-sitter 是 0-based，我们需要 1-based）
         start_line = method_node.start_point[0] + 1
         end_line = method_node.end_point[0] + 1
         
         # 解析注解
-        annotations = self._extract_annotations(method_node, source_code)
+        annotations, is_spring = self._extract_annotations(method_node, source_bytes)
         
         # 解析 JavaDoc
-        doc = self._extract_javadoc(method_node, source_code)
+        doc = self._extract_javadoc(method_node, source_bytes, line_starts)
         
         # 处理源码长度限制
         original_chars = len(method_source)
@@ -259,14 +540,16 @@ class JavaParser(BaseParser):
         # 生成 symbol_id
         symbol_id = CodeSymbol.make_symbol_id(file_path, qualified_name, start_line)
         
-        # 计算 source_hash
-        source_hash = sha256_text(method_source)
+        # 计算 source_hash（source 未截断时与原始字节一致，直接对字节求哈希，省去一次编码）
+        source_hash = sha256_text(method_source) if truncated else sha256_bytes(method_bytes)
         
         # 构建元数据
         metadata = {
-            'class_name': class_qualified_name.split('.')[-1],
+            'class_name': sys.intern(class_qualified_name.rpartition('.')[2]),
             'method_name': method_name,
             'has_annotations': len(annotations) > 0,
+            # 是否带 Spring 注解：下游可直接按该标记过滤，无需再扫描 annotations
+            'is_spring': is_spring,
             'has_javadoc': doc is not None
         }
         
@@ -298,44 +581,44 @@ class JavaParser(BaseParser):
         截断过长的源码
         
         策略：保留头部和尾部，中间用标记替代
+        
+        source 是已解码的 str（切片按字符计，不会切断多字节字符）
         """
         max_chars = self.max_chars_per_symbol
         
-        # 计算头尾各保留多少字符
-        head_chars = max_chars // 2 - 50  # 减去标记长度
-        tail_chars = max_chars // 2 - 50
+        # 计算头尾各保留多少字符（max_chars 很小时不能为负：source[:-n] / source[-0:] 会保留错误的部分）
+        head_chars = max(max_chars // 2 - 50, 0)  # 减去标记长度
+        tail_chars = max(max_chars // 2 - 50, 0)
         
         head = source[:head_chars]
-        tail = source[-tail_chars:]
+        tail = source[len(source) - tail_chars:]
         
         truncated = f"{head}\n\n... /* TRUNCATED: {original_chars - max_chars} chars omitted */ ...\n\n{tail}"
         
         return truncated
     
-    def _extract_package(self, root_node: Node, source_code: str) -> str:
+    def _extract_package(self, root_node: Node, source_bytes: bytes) -> str:
         """提取 package 名称"""
-        for node in self._find_nodes_by_type(root_node, ['package_declaration']):
-            # package_declaration 包含一个 scoped_identifier 或 identifier
-            for child in node.children:
-                if child.type in ['scoped_identifier', 'identifier']:
-                    return source_code[child.start_byte:child.end_byte]
+        # package_declaration 包含一个 scoped_identifier 或 identifier
+        for name_node, _ in self._package_query.captures(root_node):
+            return self._node_text(name_node, source_bytes)
         return ""
     
-    def _get_class_name(self, class_node: Node, source_code: str) -> str | None:
+    def _get_class_name(self, class_node: Node, source_bytes: bytes) -> str | None:
         """获取类名"""
-        for child in class_node.children:
-            if child.type == 'identifier':
-                return source_code[child.start_byte:child.end_byte]
-        return None
+        name_node = class_node.child_by_field_name('name')
+        if name_node is None:
+            return None
+        return self._node_text(name_node, source_bytes)
     
-    def _get_method_name(self, method_node: Node, source_code: str) -> str | None:
+    def _get_method_name(self, method_node: Node, source_bytes: bytes) -> str | None:
         """获取方法名"""
-        for child in method_node.children:
-            if child.type == 'identifier':
-                return source_code[child.start_byte:child.end_byte]
-        return None
+        name_node = method_node.child_by_field_name('name')
+        if name_node is None:
+            return None
+        return self._node_text(name_node, source_bytes)
     
-    def _extract_annotations(self, node: Node, source_code: str) -> list[Annotation]:
+    def _extract_annotations(self, node: Node, source_bytes: bytes) -> tuple[list[Annotation], bool]:
         """
         提取节点上的注解
         
@@ -343,42 +626,49 @@ class JavaParser(BaseParser):
         - @AnnotationName
         - @AnnotationName(value)
         - @AnnotationName(key=value, key2=value2)
+        
+        Returns:
+            (注解列表, 是否包含 SPRING_ANNOTATIONS 中的注解)
         """
         annotations = []
-        
-        # 查找 modifiers 节点，它包含注解
-        for child in node.children:
-            if child.type == 'modifiers':
-                for modifier_child in child.children:
-                    if modifier_child.type == 'marker_annotation' or \
-                       modifier_child.type == 'annotation':
-                        ann = self._parse_annotation_node(modifier_child, source_code)
-                        if ann:
-                            annotations.append(ann)
-        
-        return annotations
+        has_spring = False
+        
+        # modifiers（含注解）在声明中可选且总是第一个子节点；参数/方法体内的注解不属于该声明
+        # 节点类型用整数 kind_id 比较，public/static 等修饰符直接跳过
+        modifiers = node.child(0)
+        if modifiers is None or modifiers.kind_id not in self._modifiers_kind_ids:
+            return annotations, has_spring
+        
+        for modifier_child in modifiers.named_children:
+            if modifier_child.kind_id in self._annotation_kind_ids:
+                ann = self._parse_annotation_node(modifier_child, source_bytes)
+                if ann:
+                    annotations.append(ann)
+                    if ann.name in self.SPRING_ANNOTATIONS:
+                        has_spring = True
+        
+        return annotations, has_spring
     
-    def _parse_annotation_node(self, ann_node: Node, source_code: str) -> Annotation | None:
+    def _parse_annotation_node(self, ann_node: Node, source_bytes: bytes) -> Annotation | None:
         """解析单个注解节点"""
-        raw_text = source_code[ann_node.start_byte:ann_node.end_byte]
-        
-        # 获取注解名称
-        name = None
-        arguments = {}
-        
-        for child in ann_node.children:
-            if child.type == 'identifier' or child.type == 'scoped_identifier':
-                name = source_code[child.start_byte:child.end_byte]
-            elif child.type == 'annotation_argument_list':
-                # 解析参数列表
-                arguments = self._parse_annotation_arguments(child, source_code)
+        raw_text = self._node_text(ann_node, source_bytes)
         
+        # 获取注解名称（identifier 或 scoped_identifier）
+        name_node = ann_node.child_by_field_name('name')
+        if name_node is None:
+            return None
+        name = self._node_text(name_node, source_bytes)
         if not name:
             return None
         
+        # 解析参数列表（marker_annotation 没有参数）
+        args_node = ann_node.child_by_field_name('arguments')
+        arguments = self._parse_annotation_arguments(args_node, source_bytes) if args_node is not None else {}
+        
         # 移除 @ 前缀
         if name.startswith('@'):
             name = name[1:]
+        name = sys.intern(name)
         
         return Annotation(
             name=name,
@@ -386,7 +676,7 @@ class JavaParser(BaseParser):
             raw_text=raw_text
         )
     
-    def _parse_annotation_arguments(self, arg_list_node: Node, source_code: str) -> dict:
+    def _parse_annotation_arguments(self, arg_list_node: Node, source_bytes: bytes) -> dict:
         """解析注解参数"""
         arguments = {}
         
@@ -397,83 +687,101 @@ class JavaParser(BaseParser):
                 value = None
                 for pair_child in child.children:
                     if pair_child.type == 'identifier':
-                        key = source_code[pair_child.start_byte:pair_child.end_byte]
+                        key = self._node_text(pair_child, source_bytes)
                     elif pair_child.type in ['string_literal', 'identifier', 'integer_literal', 'boolean_literal']:
-                        value = source_code[pair_child.start_byte:pair_child.end_byte]
+                        value = self._node_text(pair_child, source_bytes)
                 
                 if key and value:
                     arguments[key] = value
             elif child.type in ['string_literal', 'identifier']:
                 # 单个值（默认是 value 参数）
-                arguments['value'] = source_code[child.start_byte:child.end_byte]
+                arguments['value'] = self._node_text(child, source_bytes)
         
         return arguments
     
-    def _extract_javadoc(self, node: Node, source_code: str) -> str | None:
+    @staticmethod
+    def _node_text(node: Node, source_bytes: bytes) -> str:
+        """取节点对应的源码文本（按字节偏移切片后解码）"""
+        return source_bytes[node.start_byte:node.end_byte].decode('utf-8', 'replace')
+    
+    @staticmethod
+    def _to_utf8_bytes(raw_bytes: bytes) -> bytes:
+        """确保源码是合法的 UTF-8 字节（非 UTF-8 文件按 latin-1 解码后转成 UTF-8）
+        
+        换行统一为 LF（与文本模式读取一致），CRLF 文件的 source/source_hash 不受换行风格影响。
+        """
+        if b'\r' in raw_bytes:
+            raw_bytes = raw_bytes.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        if raw_bytes.isascii():
+            return raw_bytes
+        try:
+            raw_bytes.decode('utf-8')
+            return raw_bytes
+        except UnicodeDecodeError:
+            # 尝试其他编码
+            return raw_bytes.decode('latin-1').encode('utf-8')
+    
+    @staticmethod
+    def _compute_line_starts(source_bytes: bytes) -> array:
+        """计算每一行的起始字节偏移（按 '\n' 分行，与 tree-sitter 的行号一致）"""
+        line_starts = array('i', [0])
+        pos = source_bytes.find(b'\n')
+        while pos != -1:
+            line_starts.append(pos + 1)
+            pos = source_bytes.find(b'\n', pos + 1)
+        return line_starts
+    
+    @staticmethod
+    def _line_at(source_bytes: bytes, line_starts: array, index: int) -> str:
+        """按行号取出一行文本（不含换行符）"""
+        end = line_starts[index + 1] - 1 if index + 1 < len(line_starts) else len(source_bytes)
+        return source_bytes[line_starts[index]:end].decode('utf-8', 'replace')
+    
+    def _extract_javadoc(self, node: Node, source_bytes: bytes, line_starts: array) -> str | None:
         """提取 JavaDoc 注释"""
         # JavaDoc 通常在节点之前
-        # 我们需要查找前面的注释节点
-        
-        # 简单实现：查找节点开始位置之前的文本，寻找 /** ... */
+        # 简单实现：从节点所在行向上逐行回溯，寻找 /** ... */
+        # 借助预先计算的行起始偏移直接切出所需的行，不再每次 split 整个文件
         start_line = node.start_point[0]
         
-        # 向上查找注释
-        lines = source_code.split('\n')
-        
-        # 从当前行向上查找
+        # 从当前行向上查找（逆序收集，最后再反转）
         javadoc_lines = []
         for i in range(start_line - 1, max(0, start_line - 20), -1):
-            line = lines[i].strip()
+            line = self._line_at(source_bytes, line_starts, i).strip()
             
             if line.endswith('*/'):
-                javadoc_lines.insert(0, line)
+                javadoc_lines.append(line)
                 # 继续向上查找
                 for j in range(i - 1, -1, -1):
-                    prev_line = lines[j].strip()
-                    javadoc_lines.insert(0, prev_line)
+                    prev_line = self._line_at(source_bytes, line_starts, j).strip()
+                    javadoc_lines.append(prev_line)
                     if prev_line.startswith('/**'):
                         # 找到了 JavaDoc 开始
-                        javadoc_text = '\n'.join(javadoc_lines)
-                        return javadoc_text
+                        javadoc_lines.reverse()
+                        return '\n'.join(javadoc_lines)
                 break
             elif line.startswith('*') or line.startswith('/**'):
-                javadoc_lines.insert(0, line)
+                javadoc_lines.append(line)
             elif line and not line.startswith('//'):
                 # 遇到非注释行，停止查找
                 break
         
         return None
     
-    def _find_nodes_by_type(self, node: Node, types: list[str]) -> Generator[Node, None, None]:
-        """递归查找指定类型的节点"""
-        if node.type in types:
-            yield node
-        
-        for child in node.children:
-            yield from self._find_nodes_by_type(child, types)
-    
     def _find_methods_in_class(self, class_node: Node) -> Generator[Node, None, None]:
-        """查找类中的所有方法"""
-        for child in class_node.children:
-            if child.type == 'class_body':
-                for body_child in child.children:
-                    if body_child.type == 'method_declaration':
-                        yield body_child
-                    elif body_child.type == 'constructor_declaration':
-                        yield body_child
+        """查找类中的所有方法（只取类体的直接成员，嵌套类由类查询单独处理）"""
+        body = class_node.child_by_field_name('body')
+        if body is None or body.type != 'class_body':
+            return
+        for body_child in body.named_children:
+            if body_child.type == 'method_declaration' or \
+               body_child.type == 'constructor_declaration':
+                yield body_child
     
     def iter_source_files(self, repo_path: Path) -> Generator[Path, None, None]:
         """迭代仓库中的所有源文件（根据profile的file_extensions）"""
-        for ext in self.file_extensions:
-            # Remove leading dot if present
-            pattern = f"*{ext}" if ext.startswith('.') else f"*.{ext}"
-            for source_file in repo_path.rglob(pattern):
-                # 检查是否应该忽略
-                if self.should_ignore(source_file):
-                    logger.debug(f"Ignoring file: {source_file}")
-                    continue
-                
-                yield source_file
+        for source_file, _ in self._iter_source_entries(repo_path):
+            yield source_file
     
     def _save_symbols(self, symbols: list[CodeSymbol], report: ParsingReport):
         """保存解析结果"""
@@ -481,27 +789,27 @@ class JavaParser(BaseParser):
         symbols_path = Path('data/raw/extracted/symbols.jsonl')
         symbols_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(symbols_path, 'w', encoding='utf-8') as f:
+        # 直接序列化为 bytes 并走大缓冲写入，避免逐行 str 编码与频繁系统调用
+        with open(symbols_path, 'wb', buffering=1 << 20) as f:
             for symbol in symbols:
-                f.write(symbol.model_dump_json() + '\n')
+                f.write(_SYMBOL_ADAPTER.dump_json(symbol) + b'\n')
         
         logger.info(f"Saved {len(symbols)} symbols to {symbols_path}")
         
+        # 元数据与详细报告内容相同，只序列化一次
+        report_json = _REPORT_ADAPTER.dump_json(report, indent=2)
+        
         # 保存元数据
         meta_path = Path('data/raw/repo_meta/repo_meta.json')
         meta_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(meta_path, 'w', encoding='utf-8') as f:
-            f.write(report.model_dump_json(indent=2))
+        meta_path.write_bytes(report_json)
         
         logger.info(f"Saved repository metadata to {meta_path}")
         
         # 保存详细报告
         report_path = Path('data/reports/parsing_report.json')
         report_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(report.model_dump_json(indent=2))
+        report_path.write_bytes(report_json)
         
         logger.info(f"Saved detailed report to {report_path}")
     
@@ -514,11 +822,51 @@ class JavaParser(BaseParser):
             'reason': reason
         }
         
+        self._skip_buffer.append(skip_entry)
+    
+    def _flush_skipped(self):
+        """把缓存的跳过记录一次性追加写入日志文件"""
+        if not self._skip_buffer:
+            return
+        entries, self._skip_buffer = self._skip_buffer, []
         try:
             with open(self.skip_log_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(skip_entry, ensure_ascii=False) + '\n')
+                f.writelines(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
         except Exception as e:
-            logger.error(f"Failed to log skipped entry: {e}")
+            logger.error(f"Failed to log {len(entries)} skipped entries: {e}")
+
+
+def _error_info(file_path: Path | str, error: Exception) -> dict:
+    """解析失败记录（写入解析报告）"""
+    return {
+        'file': str(file_path),
+        'error': str(error),
+        'type': type(error).__name__
+    }
+
+
+# 工作进程内的解析器实例（由 _init_parse_worker 创建，每个进程一个）
+_WORKER_PARSER: JavaParser | None = None
+
+
+def _init_parse_worker(config: dict) -> None:
+    """工作进程初始化：创建只做解析的 JavaParser（缓存由主进程负责）"""
+    global _WORKER_PARSER
+    _WORKER_PARSER = JavaParser(config)
+    _WORKER_PARSER.symbol_cache_path = None
+    _WORKER_PARSER.incremental_reparse = False
+
+
+def _parse_in_worker(job: tuple[str, str, str]) -> tuple[list[CodeSymbol] | None, dict | None, list[dict]]:
+    """在工作进程中解析单个文件，返回 (符号列表, 错误信息, 跳过记录)；跳过记录交给主进程统一写入"""
+    file_path, relative_path, repo_commit = job
+    try:
+        raw_bytes = Path(file_path).read_bytes()
+        symbols, error_info = _WORKER_PARSER._extract_symbols(raw_bytes, relative_path, repo_commit), None
+    except Exception as e:
+        symbols, error_info = None, _error_info(file_path, e)
+    skipped, _WORKER_PARSER._skip_buffer = _WORKER_PARSER._skip_buffer, []
+    return symbols, error_info, skipped
 
 
 def get_repo_commit(repo_path: str) -> str:
@@ -1,10 +1,19 @@
 ﻿"""Python Parser - Extract symbols from Python code (placeholder for tree-sitter implementation)"""
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from operator import attrgetter
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 import ast
+import hashlib
+import os
 import re
+import sys
 
-from src.schemas import CodeSymbol, Annotation
+from src.parser.ast_cache import SymbolCache
+from src.schemas import CodeSymbol, Annotation, sha256_text
+from src.utils.core.config import Config as ConfigClass
 from src.utils.core.logger import get_logger
 from src.parser.base import BaseParser
 
@@ -19,6 +28,23 @@ class PythonParser(BaseParser):
     Currently uses Python's built-in ast module as placeholder
     """
     
+    # Below this many files the process pool start-up costs more than it saves
+    MIN_FILES_FOR_POOL = 8
+    
+    # Bump when extraction output changes so stale symbol cache entries are ignored
+    SYMBOL_CACHE_VERSION = 1
+    
+    # Max parse_file results kept in memory for repeated calls within a process
+    PARSE_MEMO_SIZE = 4096
+    
+    # Background threads reading files ahead of the parsing loop, and how many reads may be in flight
+    READ_AHEAD_THREADS = 4
+    READ_AHEAD_FILES = 32
+    
+    # Quick prefilter: a file without these keywords has no FunctionDef/ClassDef,
+    # so ast.parse (the bulk of parse time) can be skipped entirely
+    SYMBOL_KEYWORDS = (b'def', b'class')
+    
     def __init__(self, config=None):
         """Initialize parser"""
         super().__init__(config)
@@ -27,46 +53,149 @@ class PythonParser(BaseParser):
         logger.info(f"PythonParser initialized with max_chars_per_symbol={self.max_chars_per_symbol}")
         logger.info(f"File extensions: {self.file_extensions}")
         logger.info(f"Ignore paths: {len(self.ignore_paths)} patterns")
+        
+        # Persistent symbol cache (open only during parse_repo)
+        self._symbol_cache: SymbolCache | None = None
+        # In-process LRU of parse_file results: (path, mtime_ns, size, repo_commit, repo_root) -> symbols
+        self._parse_memo: "OrderedDict[tuple, tuple[CodeSymbol, ...]]" = OrderedDict()
     
-    def parse_file(self, file_path: Path, repo_commit: str = "unknown", repo_root: Path = None) -> List[CodeSymbol]:
-        """Parse a single Python file"""
+    def parse_file(
+        self, file_path: Path, repo_commit: str = "unknown", repo_root: Path = None, raw_bytes: bytes | None = None
+    ) -> List[CodeSymbol]:
+        """Parse a single Python file (raw_bytes: file content if already read by the caller)"""
         # Use repo_root for calculating relative paths, fallback to file_path.parent
         if repo_root is None:
             repo_root = Path.cwd()
         
+        # Repeated calls for an unchanged file (same stat) reuse the previous result
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            stat = os.stat(file_path)
+            memo_key = (str(file_path), stat.st_mtime_ns, stat.st_size, repo_commit, str(repo_root))
+        except OSError:
+            memo_key = None
+        if memo_key is not None:
+            memoized = self._parse_memo.get(memo_key)
+            if memoized is not None:
+                self._parse_memo.move_to_end(memo_key)
+                return list(memoized)
+        
+        try:
+            if raw_bytes is None:
+                raw_bytes = file_path.read_bytes()
             
-            tree = ast.parse(content, filename=str(file_path))
-            symbols = []
+            # Unchanged files reuse the cached symbols (only repo_commit is re-stamped)
+            relative_path = self._relative_path(file_path, repo_root)
+            digest, symbols = self._lookup_symbol_cache(raw_bytes, relative_path, repo_commit)
+            if symbols is None:
+                symbols = self._extract_symbols(raw_bytes, file_path, repo_commit, repo_root)
+                if digest is not None:
+                    self._symbol_cache.put(relative_path, digest, symbols)
             
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    symbol = self._extract_function(node, file_path, content, repo_commit, repo_root)
-                    if symbol:
-                        symbols.append(symbol)
-                elif isinstance(node, ast.ClassDef):
-                    symbol = self._extract_class(node, file_path, content, repo_commit, repo_root)
-                    if symbol:
-                        symbols.append(symbol)
-            
-            return symbols
+            symbols = self._filter_symbols(symbols, file_path)
             
         except Exception as e:
             logger.warning(f"Failed to parse {file_path}: {e}")
             return []
+        
+        if memo_key is not None:
+            self._parse_memo[memo_key] = tuple(symbols)
+            if len(self._parse_memo) > self.PARSE_MEMO_SIZE:
+                self._parse_memo.popitem(last=False)
+        return symbols
     
-    def _extract_function(self, node: ast.FunctionDef, file_path: Path, content: str, repo_commit: str, repo_root: Path) -> CodeSymbol | None:
-        """Extract function symbol"""
+    def _extract_symbols(self, raw_bytes: bytes, file_path: Path, repo_commit: str, repo_root: Path) -> List[CodeSymbol]:
+        """
+        Extract every function/class symbol of a file, before include_private/include_test filtering.
+        
+        The unfiltered list is what gets cached, so cache entries stay valid when those flags change.
+        """
+        if not any(keyword in raw_bytes for keyword in self.SYMBOL_KEYWORDS):
+            return []
+        
+        # Same text as reading in text mode (universal newlines)
+        content = raw_bytes.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        
+        tree = ast.parse(content, filename=str(file_path))
+        line_starts = _compute_line_starts(content)
+        symbols = []
+        
+        for node in _iter_definitions(tree):
+            if isinstance(node, ast.FunctionDef):
+                symbol = self._extract_function(node, file_path, content, line_starts, repo_commit, repo_root)
+                if symbol:
+                    symbols.append(symbol)
+            elif isinstance(node, ast.ClassDef):
+                symbol = self._extract_class(node, file_path, content, line_starts, repo_commit, repo_root)
+                if symbol:
+                    symbols.append(symbol)
+        
+        return symbols
+    
+    def _filter_symbols(self, symbols: List[CodeSymbol], file_path: Path) -> List[CodeSymbol]:
+        """Apply include_private / include_test to extracted symbols"""
+        if self.include_private and self.include_test:
+            return symbols
+        # Constant per file, so checked once rather than per function
+        is_test_file = 'test' in str(file_path).lower()
+        return [s for s in symbols if self._keep_symbol(s, is_test_file)]
+    
+    def _keep_symbol(self, symbol: CodeSymbol, is_test_file: bool) -> bool:
+        """Whether a symbol passes the include_private / include_test settings"""
+        name = symbol.name
+        if symbol.symbol_type == "class":
+            # Skip private classes if configured
+            return self.include_private or not name.startswith('_')
+        
         # Skip private functions if configured
-        if not self.include_private and node.name.startswith('_') and not node.name.startswith('__'):
-            return None
+        if not self.include_private and name.startswith('_') and not name.startswith('__'):
+            return False
         
         # Skip test functions if configured
-        if not self.include_test and (node.name.startswith('test_') or 'test' in str(file_path).lower()):
-            return None
+        if not self.include_test and (name.startswith('test_') or is_test_file):
+            return False
         
+        return True
+    
+    @staticmethod
+    def _relative_path(file_path: Path, repo_root: Path) -> str:
+        """Path relative to repo_root (falls back to the file name)"""
+        try:
+            return str(file_path.relative_to(repo_root))
+        except ValueError:
+            return file_path.name
+    
+    def _lookup_symbol_cache(
+        self, raw_bytes: bytes, relative_path: str, repo_commit: str
+    ) -> tuple[bytes | None, List[CodeSymbol] | None]:
+        """Look up the symbol cache, returning (content digest, cached symbols); digest is None when the
+        cache is not open (not configured, or called outside parse_repo)"""
+        cache = self._symbol_cache
+        if cache is None:
+            return None, None
+        digest = hashlib.sha256(raw_bytes).digest()
+        cached_symbols = cache.get(relative_path, digest)
+        if cached_symbols is None:
+            return digest, None
+        return digest, [s.model_copy(update={'repo_commit': repo_commit}) for s in cached_symbols]
+    
+    def _close_symbol_cache(self) -> None:
+        """Close the symbol cache connection"""
+        if self._symbol_cache is not None:
+            self._symbol_cache.close()
+            self._symbol_cache = None
+    
+    def _open_symbol_cache(self) -> SymbolCache | None:
+        """Open the symbol cache for a parse_repo run (closed when it ends); None when symbol_cache_path is not configured"""
+        if self._symbol_cache is None and self.symbol_cache_path:
+            signature = (
+                f"python:v{self.SYMBOL_CACHE_VERSION}:python={sys.version_info[0]}.{sys.version_info[1]}"
+                f":max_chars={self.max_chars_per_symbol}"
+            )
+            self._symbol_cache = SymbolCache(self.symbol_cache_path, signature)
+        return self._symbol_cache
+    
+    def _extract_function(self, node: ast.FunctionDef, file_path: Path, content: str, line_starts: List[int], repo_commit: str, repo_root: Path) -> CodeSymbol | None:
+        """Extract function symbol"""
         # Extract decorators
         annotations = []
         for decorator in node.decorator_list:
@@ -85,8 +214,8 @@ class PythonParser(BaseParser):
         try:
             start_line = node.lineno
             end_line = node.end_lineno or start_line
-            lines = content.split('\n')
-            source = '\n'.join(lines[start_line-1:end_line])
+            # Slice the file text directly instead of splitting it into lines per symbol
+            source = content[line_starts[start_line-1]:line_starts[end_line] - 1]
             if len(source) > self.max_chars_per_symbol:
                 source = source[:self.max_chars_per_symbol] + "\n... (truncated)"
         except:
@@ -108,8 +237,6 @@ class PythonParser(BaseParser):
             node.lineno
         )
         
-        from src.schemas import sha256_text
-        
         return CodeSymbol(
             symbol_id=symbol_id,
             symbol_type="method",
@@ -126,12 +253,8 @@ class PythonParser(BaseParser):
             source_hash=sha256_text(source)
         )
     
-    def _extract_class(self, node: ast.ClassDef, file_path: Path, content: str, repo_commit: str, repo_root: Path) -> CodeSymbol | None:
+    def _extract_class(self, node: ast.ClassDef, file_path: Path, content: str, line_starts: List[int], repo_commit: str, repo_root: Path) -> CodeSymbol | None:
         """Extract class symbol"""
-        # Skip private classes if configured
-        if not self.include_private and node.name.startswith('_'):
-            return None
-        
         # Extract decorators
         annotations = []
         for decorator in node.decorator_list:
@@ -150,8 +273,8 @@ class PythonParser(BaseParser):
         try:
             start_line = node.lineno
             end_line = node.end_lineno or start_line
-            lines = content.split('\n')
-            source = '\n'.join(lines[start_line-1:end_line])
+            # Slice the file text directly instead of splitting it into lines per symbol
+            source = content[line_starts[start_line-1]:line_starts[end_line] - 1]
             if len(source) > self.max_chars_per_symbol:
                 source = source[:self.max_chars_per_symbol] + "\n... (truncated)"
         except:
@@ -172,8 +295,6 @@ class PythonParser(BaseParser):
             node.lineno
         )
         
-        from src.schemas import sha256_text
-        
         return CodeSymbol(
             symbol_id=symbol_id,
             symbol_type="class",
@@ -192,16 +313,8 @@ class PythonParser(BaseParser):
     
     def _get_decorator_name(self, decorator) -> str | None:
         """Extract decorator name from AST node"""
-        if isinstance(decorator, ast.Name):
-            return decorator.id
-        elif isinstance(decorator, ast.Call):
-            if isinstance(decorator.func, ast.Name):
-                return decorator.func.id
-            elif isinstance(decorator.func, ast.Attribute):
-                return decorator.func.attr
-        elif isinstance(decorator, ast.Attribute):
-            return decorator.attr
-        return None
+        extract = _DECORATOR_NAME_DISPATCH.get(type(decorator))
+        return extract(decorator) if extract is not None else None
     
     def parse_repo(self, repo_path: str, repo_commit: str) -> List[CodeSymbol]:
         """Parse entire Python repository"""
@@ -219,40 +332,245 @@ class PythonParser(BaseParser):
         parsed_files = 0
         failed_files = 0
         
-        # Iterate all source files based on profile's file_extensions
-        for py_file in self.iter_source_files(repo_path_obj):
-            try:
-                file_symbols = self.parse_file(py_file, repo_commit, repo_root=repo_path_obj)
-                symbols.extend(file_symbols)
-                parsed_files += 1
+        # Cache writes for the whole run go into one transaction; the connection is
+        # closed when the run ends (and reopened by the next one)
+        cache = self._open_symbol_cache()
+        try:
+            with cache.batch() if cache is not None else nullcontext():
+                # Iterate all source files based on profile's file_extensions
+                source_files = list(self.iter_source_files(repo_path_obj))
+                if self.parse_workers > 1 and len(source_files) >= self.MIN_FILES_FOR_POOL:
+                    results = self._parse_files_parallel(source_files, repo_commit, repo_path_obj)
+                else:
+                    results = self._parse_files_sequential(source_files, repo_commit, repo_path_obj)
                 
-                if parsed_files % 10 == 0:
-                    logger.info(f"Parsed {parsed_files} files, {len(symbols)} symbols so far")
-                    
-            except Exception as e:
-                failed_files += 1
-                error_info = {
-                    'file': str(py_file),
-                    'error': str(e),
-                    'type': type(e).__name__
-                }
-                errors.append(error_info)
-                logger.error(f"Failed to parse {py_file}: {e}")
+                for py_file, file_symbols, error_info in results:
+                    if error_info is None:
+                        symbols.extend(file_symbols)
+                        parsed_files += 1
+                        
+                        if parsed_files % 10 == 0:
+                            logger.info(f"Parsed {parsed_files} files, {len(symbols)} symbols so far")
+                    else:
+                        failed_files += 1
+                        errors.append(error_info)
+                        logger.error(f"Failed to parse {py_file}: {error_info['error']}")
+        finally:
+            self._close_symbol_cache()
+        
+        if cache is not None:
+            logger.info(f"Symbol cache: {cache.hits} hits, {cache.misses} misses ({cache.db_path})")
         
         parsing_time = time.time() - start_time
         logger.info(f"Parsing completed: {parsed_files} files, {len(symbols)} symbols, {failed_files} errors")
         
         return symbols
     
+    def _parse_files_sequential(
+        self, files: List[Path], repo_commit: str, repo_root: Path
+    ) -> Iterator[tuple[Path, List[CodeSymbol] | None, dict | None]]:
+        """Parse files one by one, yielding (file, symbols, error_info)"""
+        for py_file, raw_bytes in self._iter_file_contents(files):
+            try:
+                yield py_file, self.parse_file(py_file, repo_commit, repo_root=repo_root, raw_bytes=raw_bytes), None
+            except Exception as e:
+                yield py_file, None, _error_info(py_file, e)
+    
+    def _parse_files_parallel(
+        self, files: List[Path], repo_commit: str, repo_root: Path
+    ) -> Iterator[tuple[Path, List[CodeSymbol] | None, dict | None]]:
+        """
+        Fan files out over a process pool (AST building is CPU-bound and independent per file).
+        Results are yielded lazily in file order, so progress logging and output match the sequential path.
+        """
+        # Cache lookups/writes stay in this process; only misses are sent to the workers.
+        # Without a cache there is nothing to look up, so paths go straight to the pool
+        # and each file is read once, by its worker.
+        cached: dict[int, List[CodeSymbol]] = {}
+        jobs = []  # (index, relative_path, digest)
+        if self._symbol_cache is None:
+            jobs = [(i, None, None) for i in range(len(files))]
+        else:
+            for i, (py_file, raw_bytes) in enumerate(self._iter_file_contents(files)):
+                relative_path = self._relative_path(py_file, repo_root)
+                try:
+                    if raw_bytes is None:
+                        raw_bytes = py_file.read_bytes()
+                    digest, symbols = self._lookup_symbol_cache(raw_bytes, relative_path, repo_commit)
+                except Exception as e:
+                    logger.warning(f"Failed to parse {py_file}: {e}")
+                    symbols, digest = [], None
+                if symbols is not None:
+                    cached[i] = symbols
+                else:
+                    jobs.append((i, relative_path, digest))
+        
+        outcomes = iter(())
+        executor = None
+        if jobs:
+            logger.info(f"Parsing {len(jobs)} files with {self.parse_workers} worker processes")
+            config_dict = self.config._config if isinstance(self.config, ConfigClass) else self.config
+            executor = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                initializer=_init_parse_worker,
+                initargs=(config_dict,)
+            )
+            outcomes = executor.map(
+                _parse_file_worker,
+                [(str(files[i]), repo_commit, str(repo_root)) for i, _, _ in jobs],
+                chunksize=self._pool_chunksize(len(jobs))
+            )
+        
+        try:
+            pending = iter(jobs)
+            for i, py_file in enumerate(files):
+                if i in cached:
+                    file_symbols, error_info = cached[i], None
+                else:
+                    _, relative_path, digest = next(pending)
+                    file_symbols, error_info = next(outcomes), None
+                    if file_symbols is None:
+                        # Unreadable/unparsable file: no symbols (as in parse_file), nothing cached
+                        file_symbols = []
+                    elif digest is not None:
+                        self._symbol_cache.put(relative_path, digest, file_symbols)
+                yield py_file, self._filter_symbols(file_symbols, py_file), error_info
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    
+    def _iter_file_contents(self, files: List[Path]) -> Iterator[tuple[Path, bytes | None]]:
+        """
+        Yield (file, content) in order while a small thread pool reads the next files ahead,
+        so file I/O overlaps with parsing. content is None when the read failed; callers
+        re-read the file themselves to surface the error as before.
+        """
+        if len(files) < 2:
+            yield from ((f, None) for f in files)
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.READ_AHEAD_THREADS, thread_name_prefix="py-read") as pool:
+            pending = deque()
+            next_index = 0
+            for py_file in files:
+                while next_index < len(files) and len(pending) < self.READ_AHEAD_FILES:
+                    pending.append(pool.submit(_read_bytes_or_none, files[next_index]))
+                    next_index += 1
+                yield py_file, pending.popleft().result()
+    
     def iter_source_files(self, repo_path: Path):
-        """Iterate source files in repository based on profile's file_extensions"""
-        for ext in self.file_extensions:
-            # Remove leading dot if present
-            pattern = f"*{ext}" if ext.startswith('.') else f"*.{ext}"
-            for source_file in repo_path.rglob(pattern):
-                # Check if should ignore
-                if self.should_ignore(source_file):
-                    logger.debug(f"Ignoring file: {source_file}")
-                    continue
-                
+        """
+        Iterate source files in repository based on profile's file_extensions.
+        
+        The tree is walked once (pruning ignored directories); files are still grouped
+        extension by extension, in the order the profile lists them.
+        """
+        suffixes = [ext if ext.startswith('.') else f".{ext}" for ext in self.file_extensions]
+        if len(suffixes) == 1:
+            for source_file, _ in self._iter_source_entries(repo_path):
                 yield source_file
+            return
+        
+        buckets: List[List[Path]] = [[] for _ in suffixes]
+        for source_file, _ in self._iter_source_entries(repo_path):
+            name = source_file.name
+            for bucket, suffix in zip(buckets, suffixes):
+                if name.endswith(suffix):
+                    bucket.append(source_file)
+        for bucket in buckets:
+            yield from bucket
+
+
+def _compute_line_starts(content: str) -> List[int]:
+    """
+    Offsets of each line start in content, plus one past the end.
+    
+    content[starts[a]:starts[b] - 1] equals '\\n'.join(content.split('\\n')[a:b]).
+    """
+    starts = [0]
+    offset = 0
+    for line in content.split('\n'):
+        offset += len(line) + 1
+        starts.append(offset)
+    return starts
+
+
+def _called_decorator_name(decorator: ast.Call) -> str | None:
+    """Name of a called decorator: @name(...) or @obj.name(...)"""
+    func = decorator.func
+    if type(func) is ast.Name:
+        return func.id
+    if type(func) is ast.Attribute:
+        return func.attr
+    return None
+
+
+# Decorator node type -> name extractor (one dict lookup instead of an isinstance chain)
+_DECORATOR_NAME_DISPATCH = {
+    ast.Name: attrgetter('id'),
+    ast.Attribute: attrgetter('attr'),
+    ast.Call: _called_decorator_name,
+}
+
+
+# Statement-list fields, in the same order ast.iter_child_nodes yields them
+_BODY_FIELDS = ('body', 'handlers', 'orelse', 'finalbody', 'cases')
+
+
+def _iter_definitions(tree: ast.AST) -> Iterator[ast.AST]:
+    """
+    Yield every FunctionDef/ClassDef in the same breadth-first order as ast.walk.
+    
+    Definitions can only appear in statement lists, so only those are descended into;
+    expressions, names and constants are never visited.
+    """
+    queue = [tree]
+    for node in queue:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            yield node
+        for field in _BODY_FIELDS:
+            children = getattr(node, field, None)
+            if children:
+                queue.extend(children)
+
+
+def _read_bytes_or_none(file_path: Path) -> bytes | None:
+    """Read a file's bytes, None on failure (read-ahead helper)"""
+    try:
+        return file_path.read_bytes()
+    except OSError:
+        return None
+
+
+def _error_info(file_path: Path | str, error: Exception) -> dict:
+    """Failure record for the parsing report"""
+    return {
+        'file': str(file_path),
+        'error': str(error),
+        'type': type(error).__name__
+    }
+
+
+# Per-process parser instance used by pool workers (created by _init_parse_worker)
+_WORKER_PARSER: PythonParser | None = None
+
+
+def _init_parse_worker(config: dict) -> None:
+    """Pool initializer: build one PythonParser per worker process"""
+    global _WORKER_PARSER
+    _WORKER_PARSER = PythonParser(config)
+
+
+def _parse_file_worker(job: tuple[str, str, str]) -> List[CodeSymbol] | None:
+    """
+    Extract the (unfiltered) symbols of a single file inside a worker process.
+    
+    Like parse_file, a file that cannot be read or parsed is logged and yields None instead of raising.
+    """
+    file_path, repo_commit, repo_root = job
+    path = Path(file_path)
+    try:
+        return _WORKER_PARSER._extract_symbols(path.read_bytes(), path, repo_commit, Path(repo_root))
+    except Exception as e:
+        logger.warning(f"Failed to parse {file_path}: {e}")
+        return None
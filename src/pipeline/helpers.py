@@ -36,6 +36,11 @@ def get_repo_commit(repo_path: Path, config_commit: str = None) -> str:
     git_dir = repo_path / ".git"
     
     if git_dir.exists():
+        # Resolve HEAD from the .git files first; spawning git is only the fallback
+        commit = _read_head_commit(git_dir)
+        if commit:
+            logger.info(f"Got commit from git: {commit[:8]}...")
+            return commit
         try:
             result = subprocess.run(
                 ["git", "-C", str(repo_path), "rev-parse", "HEAD"],
@@ -55,6 +60,57 @@ def get_repo_commit(repo_path: Path, config_commit: str = None) -> str:
     return "UNKNOWN_COMMIT"
 
 
+def _read_head_commit(git_dir: Path) -> str | None:
+    """
+    Resolve HEAD to a commit hash by reading the repository files directly.
+    
+    Handles a detached HEAD, loose refs, packed-refs and ".git" files pointing
+    elsewhere (worktrees/submodules). Returns None whenever the layout is not
+    understood, so the caller can fall back to `git rev-parse HEAD`.
+    """
+    try:
+        if git_dir.is_file():
+            # Worktree/submodule: ".git" contains "gitdir: <path>"
+            content = git_dir.read_text(encoding="utf-8").strip()
+            if not content.startswith("gitdir:"):
+                return None
+            git_dir = (git_dir.parent / content[len("gitdir:"):].strip()).resolve()
+        
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        if not head.startswith("ref:"):
+            return head if _is_commit_hash(head) else None
+        ref = head[len("ref:"):].strip()
+        
+        # Branch refs live in the common dir for linked worktrees
+        common_dir = git_dir
+        commondir_file = git_dir / "commondir"
+        if commondir_file.is_file():
+            common_dir = (git_dir / commondir_file.read_text(encoding="utf-8").strip()).resolve()
+        
+        for base in dict.fromkeys((git_dir, common_dir)):
+            ref_file = base / ref
+            if ref_file.is_file():
+                commit = ref_file.read_text(encoding="utf-8").strip()
+                return commit if _is_commit_hash(commit) else None
+        
+        packed_refs = common_dir / "packed-refs"
+        if packed_refs.is_file():
+            for line in packed_refs.read_text(encoding="utf-8").splitlines():
+                if line.startswith(("#", "^")):
+                    continue
+                commit, _, name = line.partition(" ")
+                if name.strip() == ref:
+                    return commit if _is_commit_hash(commit) else None
+    except (OSError, UnicodeDecodeError):
+        pass
+    return None
+
+
+def _is_commit_hash(value: str) -> bool:
+    """SHA-1 (40) or SHA-256 (64) hex object name"""
+    return len(value) in (40, 64) and all(c in "0123456789abcdef" for c in value.lower())
+
+
 def should_skip_parse(repo_meta_path: Path, symbols_path: Path, current_commit: str) -> bool:
     """
     Check if parsing can be skipped based on cache.
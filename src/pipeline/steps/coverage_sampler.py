@@ -4,28 +4,50 @@ Coverage sampling step.
 from __future__ import annotations
 
 import random
-from collections import defaultdict
 from pathlib import Path
 
 from src.pipeline.base_step import BaseStep
-from src.utils.io.file_ops import read_jsonl, write_jsonl, write_json
+from src.utils.io.file_ops import iter_jsonl, write_jsonl, write_json
 from src.utils.data.coverage import (
     BUCKETS,
     DEFAULT_TARGETS,
     FALLBACK_CHAIN,
     normalize_targets,
     desired_counts,
+    coverage_of,
     compute_multi_distributions,
 )
 
 
+_BUCKET_SET = frozenset(BUCKETS)
+
+
+def _bucket_of(sample: dict) -> str:
+    """Coverage bucket of a sample (missing/unknown buckets count as high)."""
+    bucket = coverage_of(sample).get("bucket", "high")
+    return bucket if bucket in _BUCKET_SET else "high"
+
+
 def _pick_samples(rng: random.Random, samples: list[dict], count: int) -> tuple[list[dict], list[dict]]:
-    """Pick samples from list and return (selected, remaining)."""
+    """Pick a uniform random subset and return (selected, remaining).
+
+    Reorders ``samples`` in place. Only the selected part is in random order; callers
+    that draw from ``remaining`` again must pick randomly rather than take a prefix.
+    """
     if count <= 0:
         return [], samples
-    if count >= len(samples):
+    n = len(samples)
+    if count >= n:
         return samples, []
-    rng.shuffle(samples)
+    if count * 2 > n:
+        # Most of the list is kept: a full shuffle is cheaper than count randrange calls
+        rng.shuffle(samples)
+        return samples[:count], samples[count:]
+    # Partial Fisher-Yates: only the first `count` slots need to be settled
+    randrange = rng.randrange
+    for i in range(count):
+        j = randrange(i, n)
+        samples[i], samples[j] = samples[j], samples[i]
     return samples[:count], samples[count:]
 
 
@@ -36,8 +58,15 @@ def _sample_by_targets(
     logger=None,
     scope: str | None = None,
     negative_ratio: float | None = None,
+    grouped: dict[str, list[dict]] | None = None,
+    emit_distributions: bool = True,
 ) -> tuple[list[dict], dict]:
-    """Sample by coverage targets with optional negative ratio."""
+    """Sample by coverage targets with optional negative ratio.
+
+    grouped: samples already split by _bucket_of (in file order), when the caller
+    bucketed them while reading. Its lists are consumed (reordered in place).
+    emit_distributions: add the per-dimension distributions of the result to the report.
+    """
     rng = random.Random(seed)
     total = len(samples)
     normalized_targets, used_default = normalize_targets(targets)
@@ -50,33 +79,31 @@ def _sample_by_targets(
         )
     desired = desired_counts(total, normalized_targets)
 
-    grouped: dict[str, list[dict]] = defaultdict(list)
-    for sample in samples:
-        bucket = (
-            sample.get("quality", {})
-            .get("coverage", {})
-            .get("bucket", "high")
-        )
-        if bucket not in BUCKETS:
-            bucket = "high"
-        grouped[bucket].append(sample)
+    if grouped is None:
+        grouped = {bucket: [] for bucket in BUCKETS}
+        for sample in samples:
+            grouped[_bucket_of(sample)].append(sample)
 
     selected: dict[str, list[dict]] = {}
     remaining: dict[str, list[dict]] = {}
     polarity_deficits: dict[str, int] = {}
     for bucket in BUCKETS:
-        bucket_samples = grouped.get(bucket, []).copy()
+        # grouped is not read again, so its lists are reordered in place instead of copied
+        bucket_samples = grouped.get(bucket, [])
         if negative_ratio is None:
             picks, rest = _pick_samples(rng, bucket_samples, desired[bucket])
             selected[bucket] = picks
             remaining[bucket] = rest
             continue
 
-        negatives = [
-            sample for sample in bucket_samples
-            if sample.get("quality", {}).get("coverage", {}).get("polarity") == "negative"
-        ]
-        positives = [sample for sample in bucket_samples if sample not in negatives]
+        # One partitioning pass (a "not in negatives" filter is quadratic in bucket size)
+        negatives: list[dict] = []
+        positives: list[dict] = []
+        for sample in bucket_samples:
+            if coverage_of(sample).get("polarity") == "negative":
+                negatives.append(sample)
+            else:
+                positives.append(sample)
         desired_neg = int(round(desired[bucket] * float(negative_ratio)))
         desired_pos = max(0, desired[bucket] - desired_neg)
 
@@ -96,26 +123,25 @@ def _sample_by_targets(
         remaining[bucket] = rest_pool
         polarity_deficits[bucket] = max(0, desired_neg - len(neg_picks))
 
-    borrowed = defaultdict(lambda: defaultdict(int))
+    borrowed: dict[str, dict[str, int]] = {}
     deficits = {
         bucket: max(0, desired[bucket] - len(selected[bucket]))
         for bucket in BUCKETS
     }
 
+    # Single sweep from the scarcest bucket up; every bucket has a remaining list
     for bucket in ("hard", "mid"):
         deficit = deficits[bucket]
-        if deficit <= 0:
-            continue
         for fallback in FALLBACK_CHAIN[bucket]:
             if deficit <= 0:
                 break
-            available = remaining.get(fallback, [])
+            available = remaining[fallback]
             if not available:
                 continue
             take = min(deficit, len(available))
-            selected[bucket].extend(available[:take])
-            remaining[fallback] = available[take:]
-            borrowed[bucket][fallback] += take
+            picks, remaining[fallback] = _pick_samples(rng, available, take)
+            selected[bucket].extend(picks)
+            borrowed.setdefault(bucket, {})[fallback] = take
             deficit -= take
         deficits[bucket] = deficit
 
@@ -133,11 +159,12 @@ def _sample_by_targets(
         "desired_counts": desired,
         "final_counts": final_counts,
         "deficits": deficits,
-        "borrowed": {k: dict(v) for k, v in borrowed.items()},
+        "borrowed": borrowed,
         "negative_ratio": negative_ratio,
         "negative_deficits": polarity_deficits,
     }
-    report.update(compute_multi_distributions(final_samples))
+    if emit_distributions:
+        report.update(compute_multi_distributions(final_samples))
     return final_samples, report
 
 
@@ -160,30 +187,46 @@ class CoverageSamplerStep(BaseStep):
         mode: str,
         min_sample_size: int,
         negative_ratio: float | None,
+        emit_distributions: bool = True,
     ) -> tuple[list[dict], dict]:
         if not path.exists():
             self.logger.info("Coverage sampling skipped, file not found: %s", path)
             return [], {"path": str(path), "skipped": True, "reason": "missing"}
 
-        samples = read_jsonl(path)
-        if not samples:
-            self.logger.info("Coverage sampling skipped, empty file: %s", path)
-            return [], {"path": str(path), "skipped": True, "reason": "empty"}
-
         normalized_targets, used_default = normalize_targets(targets)
 
         if mode == "upstream":
+            # Nothing is rewritten in upstream mode: count the stream directly, keep no rows
+            if emit_distributions:
+                distributions = compute_multi_distributions(iter_jsonl(path))
+                total = sum(distributions["bucket_distribution"]["counts"].values())
+            else:
+                distributions = {}
+                total = sum(1 for _ in iter_jsonl(path))
+            if not total:
+                self.logger.info("Coverage sampling skipped, empty file: %s", path)
+                return [], {"path": str(path), "skipped": True, "reason": "empty"}
             report = {
                 "path": str(path),
                 "skipped": True,
                 "reason": "mode=upstream",
-                "total": len(samples),
+                "total": total,
                 "targets": normalized_targets,
                 "raw_targets": targets,
                 "used_default_targets": used_default,
             }
-            report.update(compute_multi_distributions(samples))
-            return samples, report
+            report.update(distributions)
+            return [], report
+
+        # Stream rows once, bucketing them in the same pass
+        samples: list[dict] = []
+        grouped: dict[str, list[dict]] = {bucket: [] for bucket in BUCKETS}
+        for sample in iter_jsonl(path):
+            samples.append(sample)
+            grouped[_bucket_of(sample)].append(sample)
+        if not samples:
+            self.logger.info("Coverage sampling skipped, empty file: %s", path)
+            return [], {"path": str(path), "skipped": True, "reason": "empty"}
 
         if len(samples) < min_sample_size:
             report = {
@@ -196,7 +239,8 @@ class CoverageSamplerStep(BaseStep):
                 "raw_targets": targets,
                 "used_default_targets": used_default,
             }
-            report.update(compute_multi_distributions(samples))
+            if emit_distributions:
+                report.update(compute_multi_distributions(samples))
             return samples, report
 
         sampled, report = _sample_by_targets(
@@ -206,33 +250,30 @@ class CoverageSamplerStep(BaseStep):
             self.logger,
             path.name,
             negative_ratio=negative_ratio,
+            grouped=grouped,
+            emit_distributions=emit_distributions,
         )
         report["path"] = str(path)
         return sampled, report
 
+    def _artifact_path(self, artifacts: dict, key: str, default: str) -> Path:
+        """Resolve an artifact path: config artifacts, then self.paths, then default."""
+        if key in artifacts:
+            return Path(artifacts[key])
+        return Path(self.paths.get(key, default))
+
     def execute(self) -> dict:
-        artifacts = self.config.get("artifacts", {})
-        qa_clean_path = Path(
-            artifacts.get(
-                "qa_clean_jsonl",
-                self.paths.get("qa_clean_jsonl", "data/intermediate/clean/qa_clean.jsonl"),
-            )
-        )
-        design_clean_path = Path(
-            artifacts.get(
-                "design_clean_jsonl",
-                self.paths.get(
-                    "design_clean_jsonl",
-                    "data/intermediate/clean/design_clean.jsonl",
-                ),
-            )
+        artifacts = self.config.get("artifacts", {}) or {}
+        qa_clean_path = self._artifact_path(
+            artifacts, "qa_clean_jsonl", "data/intermediate/clean/qa_clean.jsonl"
         )
-        report_path = Path(
-            artifacts.get(
-                "coverage_report_json",
-                self.paths.get("reports", "data/reports") / "coverage_report.json",
-            )
+        design_clean_path = self._artifact_path(
+            artifacts, "design_clean_jsonl", "data/intermediate/clean/design_clean.jsonl"
         )
+        if "coverage_report_json" in artifacts:
+            report_path = Path(artifacts["coverage_report_json"])
+        else:
+            report_path = Path(self.paths.get("reports", "data/reports")) / "coverage_report.json"
 
         seed = int(self.config.get("core.seed", 42))
         qa_cov = self.config.get("question_answer.coverage", {}) or {}
@@ -247,6 +288,9 @@ class CoverageSamplerStep(BaseStep):
         design_min_samples = int(design_cov.get("min_sample_size", 30))
         qa_negative_ratio = qa_cov.get("negative_ratio")
         design_negative_ratio = design_cov.get("negative_ratio")
+        # Distributions cost a pass over every row; runs that only need totals can turn them off
+        qa_emit_distributions = bool(qa_cov.get("emit_distributions", True))
+        design_emit_distributions = bool(design_cov.get("emit_distributions", True))
 
         qa_samples, qa_report = self._sample_file(
             qa_clean_path,
@@ -255,6 +299,7 @@ class CoverageSamplerStep(BaseStep):
             qa_mode,
             qa_min_samples,
             qa_negative_ratio,
+            qa_emit_distributions,
         )
         if qa_samples and qa_mode != "upstream":
             write_jsonl(qa_clean_path, qa_samples)
@@ -266,6 +311,7 @@ class CoverageSamplerStep(BaseStep):
             design_mode,
             design_min_samples,
             design_negative_ratio,
+            design_emit_distributions,
         )
         if design_samples and design_mode != "upstream":
             write_jsonl(design_clean_path, design_samples)
@@ -3,7 +3,9 @@ Coverage tagging step.
 """
 from __future__ import annotations
 
+import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from src.pipeline.base_step import BaseStep
@@ -16,33 +18,77 @@ from src.utils.data.coverage import (
 )
 
 
-def _apply_coverage(sample: dict, default_source: str, evidence_cfg: dict) -> dict:
-    """Apply coverage tags to a sample."""
+# Files below this many rows per extra worker are tagged in-process: spawning workers and
+# shipping the text costs more than the keyword scans save
+PARALLEL_ROWS_PER_WORKER = 4096
+
+
+def _evidence_refs(sample: dict) -> list:
+    thought = sample.get("thought")
+    refs = thought.get("evidence_refs") if isinstance(thought, dict) else []
+    return refs or []
+
+
+def _text_labels_job(sample: dict) -> tuple[str, bool, str | None, str, bool] | None:
+    """Inputs for _infer_text_labels, or None when intent and bucket are both labeled.
+
+    Only the text and the labels the inference depends on are included, so the job is
+    cheap to send to a worker process (the sample itself never leaves the parent).
+    """
+    coverage = (sample.get("quality") or {}).get("coverage") or {}
+    need_intent = "intent" not in coverage
+    need_bucket = "bucket" not in coverage
+    if not (need_intent or need_bucket):
+        return None
+    if "module_span" in coverage:
+        module_span = coverage["module_span"]
+    else:
+        module_span = infer_module_span(_evidence_refs(sample))
+    text = f"{sample.get('instruction', '')} {sample.get('answer', '')}"
+    return text, need_intent, coverage.get("intent"), module_span, need_bucket
+
+
+def _infer_text_labels(job: tuple[str, bool, str | None, str, bool]) -> tuple[str | None, str | None]:
+    """Keyword-based (intent, bucket before the evidence adjustment) for one job."""
+    text, need_intent, intent, module_span, need_bucket = job
+    # Keyword matching text is lowercased once, shared by intent and bucket inference
+    text = text.lower()
+    if need_intent:
+        intent = infer_intent(text, already_lower=True)
+    bucket = infer_bucket(intent, module_span, text, already_lower=True) if need_bucket else None
+    return intent, bucket
+
+
+def _apply_coverage(
+    sample: dict,
+    default_source: str,
+    evidence_cfg: dict,
+    text_labels: tuple[str | None, str | None] | None = None,
+) -> dict:
+    """Apply coverage tags to a sample.
+
+    text_labels: result of _infer_text_labels for this sample when it was computed
+    elsewhere (e.g. in a worker process); inferred here when omitted.
+    """
     quality = sample.get("quality") or {}
     coverage = quality.get("coverage") or {}
 
     scenario = coverage.get("scenario") or sample.get("scenario", "")
-    evidence_refs = (
-        sample.get("thought", {}).get("evidence_refs")
-        if isinstance(sample.get("thought"), dict)
-        else []
-    ) or []
+    evidence_refs = _evidence_refs(sample)
     evidence_count = len(evidence_refs) if isinstance(evidence_refs, list) else 0
 
+    if text_labels is None:
+        job = _text_labels_job(sample)
+        text_labels = _infer_text_labels(job) if job is not None else (None, None)
+    intent, bucket = text_labels
+
     if "intent" not in coverage:
-        text = f"{sample.get('instruction', '')} {sample.get('answer', '')}"
-        coverage["intent"] = infer_intent(text)
+        coverage["intent"] = intent
 
     if "module_span" not in coverage:
         coverage["module_span"] = infer_module_span(evidence_refs)
 
     if "bucket" not in coverage:
-        text = f"{sample.get('instruction', '')} {sample.get('answer', '')}"
-        bucket = infer_bucket(
-            coverage.get("intent", "how_to"),
-            coverage.get("module_span", "single"),
-            text,
-        )
         coverage["bucket"] = apply_evidence_bucket(bucket, evidence_count, evidence_cfg)
 
     coverage.setdefault("source", default_source)
@@ -64,6 +110,28 @@ class CoverageTaggerStep(BaseStep):
     def display_name(self) -> str:
         return "Step 6: Coverage Tagging"
 
+    def _infer_labels_parallel(self, samples: list[dict]) -> list[tuple | None] | None:
+        """Run the keyword inference of a large file on a process pool.
+
+        Returns per-sample text labels (None where nothing needs inferring), or None
+        when the file is too small to be worth a pool.
+        """
+        workers = min(os.cpu_count() or 1, len(samples) // PARALLEL_ROWS_PER_WORKER)
+        if workers <= 1:
+            return None
+        jobs = [_text_labels_job(sample) for sample in samples]
+        pending = [job for job in jobs if job is not None]
+        if not pending:
+            return None
+        self.logger.info("Coverage tagging %d samples with %d worker processes", len(pending), workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = iter(list(executor.map(
+                _infer_text_labels,
+                pending,
+                chunksize=max(1, len(pending) // (workers * 4)),
+            )))
+        return [None if job is None else next(results) for job in jobs]
+
     def _tag_file(self, path: Path, default_source: str, evidence_cfg: dict) -> dict:
         if not path.exists():
             self.logger.info("Coverage tagging skipped, file not found: %s", path)
@@ -74,7 +142,14 @@ class CoverageTaggerStep(BaseStep):
             self.logger.info("Coverage tagging skipped, empty file: %s", path)
             return {"path": str(path), "tagged": 0, "total": 0}
 
-        tagged = [_apply_coverage(sample, default_source, evidence_cfg) for sample in samples]
+        text_labels = self._infer_labels_parallel(samples)
+        if text_labels is None:
+            tagged = [_apply_coverage(sample, default_source, evidence_cfg) for sample in samples]
+        else:
+            tagged = [
+                _apply_coverage(sample, default_source, evidence_cfg, labels)
+                for sample, labels in zip(samples, text_labels)
+            ]
         write_jsonl(path, tagged)
 
         counts = defaultdict(int)
@@ -50,11 +50,11 @@ class DesignGenerationStep(BaseStep):
             self.logger.info("=" * 70)
             
             try:
-                question_gen = DesignQuestionGenerator(config_instance)
-                design_question_dicts = question_gen.generate_from_repo(
-                    symbols_path=self.paths["symbols_jsonl"],
-                    repo_commit=self.repo_commit
-                )
+                with DesignQuestionGenerator(config_instance) as question_gen:
+                    design_question_dicts = question_gen.generate_from_repo(
+                        symbols_path=self.paths["symbols_jsonl"],
+                        repo_commit=self.repo_commit
+                    )
                 
                 # Convert to DesignQuestion objects
                 custom_design_questions = [
@@ -80,27 +80,23 @@ class DesignGenerationStep(BaseStep):
         self.logger.info(" Step 3b: Generating Design Samples")
         self.logger.info("=" * 70)
         
-        design_gen = DesignGenerator(config_instance)
-        
         # Use auto-generated design questions or default
         if custom_design_questions:
             self.logger.info(f"Using {len(custom_design_questions)} auto-generated design questions")
             self.logger.info(f"Auto design question IDs: {[q.id for q in custom_design_questions[:3]]}")
-            design_samples = design_gen.generate_from_repo(
-                symbols_path=self.paths["symbols_jsonl"],
-                repo_commit=self.repo_commit,
-                design_questions=custom_design_questions
-            )
+            design_questions = custom_design_questions
         else:
             if use_auto_design_questions:
                 self.logger.warning("Auto design questions enabled but none generated, falling back to user config")
             else:
                 self.logger.info("Using user design questions from config")
-            user_design_questions = load_design_questions_config(user_design_questions_path)
+            design_questions = load_design_questions_config(user_design_questions_path)
+        
+        with DesignGenerator(config_instance) as design_gen:
             design_samples = design_gen.generate_from_repo(
                 symbols_path=self.paths["symbols_jsonl"],
                 repo_commit=self.repo_commit,
-                design_questions=user_design_questions,
+                design_questions=design_questions,
             )
         
         self.logger.info(
@@ -43,11 +43,11 @@ class MethodUnderstandingStep(BaseStep):
         config_instance = Config()
         config_instance.reload(self.args.config)
 
-        understander = MethodUnderstander(config_instance)
-        method_profiles = understander.generate_from_symbols(
-            symbols_path=self.paths["symbols_jsonl"],
-            repo_commit=self.repo_commit,
-        )
+        with MethodUnderstander(config_instance) as understander:
+            method_profiles = understander.generate_from_symbols(
+                symbols_path=self.paths["symbols_jsonl"],
+                repo_commit=self.repo_commit,
+            )
 
         self.logger.info(f"Generated {len(method_profiles)} method profiles")
 
@@ -69,8 +69,8 @@ class ParseStep(BaseStep):
             "license": license_info
         }
         
-        # Write outputs
-        write_jsonl(self.paths["symbols_jsonl"], [s.model_dump() for s in symbols])
+        # Write outputs (dump symbols one at a time while writing, not into a second full list)
+        write_jsonl(self.paths["symbols_jsonl"], (s.model_dump() for s in symbols))
         write_json(self.paths["repo_meta_json"], repo_meta)
         
         self.logger.info(f"Parsed {len(symbols)} symbols")
@@ -82,6 +82,8 @@ class QuestionAnswerStep(BaseStep):
         method_profiles_jsonl = Path(artifacts.get("method_profiles_jsonl", "data/intermediate/method_profiles.jsonl"))
         method_embeddings_jsonl = Path(artifacts.get("method_embeddings_jsonl", "data/intermediate/method_embeddings.jsonl"))
         questions_jsonl = Path(artifacts.get("questions_jsonl", "data/intermediate/auto_questions/questions.jsonl"))
+        embedding_batch_size = qa_config.get("embedding_batch_size", vector_index.DEFAULT_EMBED_BATCH_SIZE)
+        embedding_workers = qa_config.get("embedding_workers", vector_index.DEFAULT_EMBED_WORKERS)
         
         # Following steps only if QA is needed
         if self.need_qa:
@@ -104,7 +106,9 @@ class QuestionAnswerStep(BaseStep):
                 vector_index.build_embeddings(
                     profiles_jsonl=method_profiles_jsonl,
                     embeddings_jsonl=method_embeddings_jsonl,
-                    embedding_model=embedding_model
+                    embedding_model=embedding_model,
+                    batch_size=embedding_batch_size,
+                    workers=embedding_workers
                 )
                 self.logger.info(f"Embeddings saved to {method_embeddings_jsonl.name}")
                 
@@ -112,12 +116,12 @@ class QuestionAnswerStep(BaseStep):
                 questions_per_method = qa_config.get("questions_per_method", 5)
                 max_questions = qa_config.get("max_questions")
                 self.logger.info(f"Step A3: Generating questions ({questions_per_method} per method, max: {max_questions or 'unlimited'})")
-                question_gen = QuestionGenerator(config_instance)
-                questions = question_gen.generate_from_profiles(
-                    profiles_jsonl=method_profiles_jsonl,
-                    symbols_map=symbols_map,
-                    repo_commit=self.repo_commit
-                )
+                with QuestionGenerator(config_instance) as question_gen:
+                    questions = question_gen.generate_from_profiles(
+                        profiles_jsonl=method_profiles_jsonl,
+                        symbols_map=symbols_map,
+                        repo_commit=self.repo_commit
+                    )
                 warnings_report_path = Path(
                     artifacts.get(
                         "question_warnings_report_json",
@@ -165,6 +169,8 @@ class QuestionAnswerStep(BaseStep):
                         profiles_jsonl=method_profiles_jsonl,
                         embeddings_jsonl=method_embeddings_jsonl,
                         embedding_model=embedding_model,
+                        batch_size=embedding_batch_size,
+                        workers=embedding_workers,
                     )
                     self.logger.info(f"Embeddings saved to {method_embeddings_jsonl.name}")
 
@@ -202,12 +208,12 @@ class QuestionAnswerStep(BaseStep):
                 self.config.get("generation", {}).get("retrieval_top_k", 6),
             )
             self.logger.info(f"Step A4: Generating answers (top_k: {top_k_context})")
-            answer_gen = AnswerGenerator(config_instance)
-            qa_samples = answer_gen.generate_from_questions(
-                questions_jsonl=questions_jsonl,
-                symbols_map=symbols_map,
-                repo_commit=self.repo_commit
-            )
+            with AnswerGenerator(config_instance) as answer_gen:
+                qa_samples = answer_gen.generate_from_questions(
+                    questions_jsonl=questions_jsonl,
+                    symbols_map=symbols_map,
+                    repo_commit=self.repo_commit
+                )
             total_q = answer_gen.stats['total_questions']
             if total_q == 0:
                 self.logger.warning("AnswerGenerator processed 0 questions. Check questions.jsonl content.")
@@ -4,6 +4,7 @@
 
 from .base import (
     sha256_text,
+    sha256_bytes,
     now_iso,
     Annotation
 )
@@ -29,6 +30,7 @@ from .reports import (
 
 __all__ = [
     "sha256_text",
+    "sha256_bytes",
     "now_iso",
     "Annotation",
     "CodeSymbol",
@@ -6,6 +6,10 @@ def sha256_text(text: str) -> str:
     """计算文本的 SHA256 哈希值"""
     return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
+def sha256_bytes(data: bytes | memoryview) -> str:
+    """计算字节串的 SHA256 哈希值（对 UTF-8 编码的文本与 sha256_text 结果一致）"""
+    return hashlib.sha256(data).hexdigest()
+
 def now_iso() -> str:
     """返回当前 UTC 时间的 ISO 格式字符串"""
     return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.utils.io.file_ops import BackgroundJsonlWriter, read_jsonl
+
+
+class _FailingHandle:
+    """Stands in for the writer's file handle and fails every write"""
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        raise OSError("disk full")
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _failing_writer(path: Path) -> BackgroundJsonlWriter:
+    writer = BackgroundJsonlWriter(path)
+    writer._fh.close()
+    writer._fh = _FailingHandle()
+    return writer
+
+
+def test_writer_preserves_order(tmp_path: Path) -> None:
+    path = tmp_path / "out" / "rows.jsonl"
+    with BackgroundJsonlWriter(path, maxsize=8) as writer:
+        for i in range(500):
+            if i % 2:
+                writer.write({"i": i})
+            else:
+                writer.write(f'{{"i": {i}}}')
+
+    assert [row["i"] for row in read_jsonl(path)] == list(range(500))
+
+
+def test_writer_keeps_per_producer_order(tmp_path: Path) -> None:
+    path = tmp_path / "rows.jsonl"
+    with BackgroundJsonlWriter(path, maxsize=4) as writer:
+        def produce(producer: int) -> None:
+            for i in range(200):
+                writer.write({"producer": producer, "i": i})
+
+        threads = [threading.Thread(target=produce, args=(p,)) for p in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    rows = read_jsonl(path)
+    assert len(rows) == 800
+    for producer in range(4):
+        assert [r["i"] for r in rows if r["producer"] == producer] == list(range(200))
+
+
+def test_writer_append_mode(tmp_path: Path) -> None:
+    path = tmp_path / "rows.jsonl"
+    with BackgroundJsonlWriter(path) as writer:
+        writer.write({"i": 0})
+    with BackgroundJsonlWriter(path, mode="a") as writer:
+        writer.write({"i": 1})
+
+    assert [row["i"] for row in read_jsonl(path)] == [0, 1]
+
+
+def test_writer_error_raised_from_close(tmp_path: Path) -> None:
+    writer = _failing_writer(tmp_path / "rows.jsonl")
+    writer.write({"i": 0})
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
+    assert writer._fh.closed
+    # Closing again is a no-op and writes are refused
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.write({"i": 1})
+
+
+def test_writer_error_raised_from_exit(tmp_path: Path) -> None:
+    with pytest.raises(OSError, match="disk full"):
+        with _failing_writer(tmp_path / "rows.jsonl") as writer:
+            writer.write({"i": 0})
+
+
+def test_writer_error_does_not_mask_body_exception(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError, match="generation failed"):
+        with _failing_writer(tmp_path / "rows.jsonl") as writer:
+            writer.write({"i": 0})
+            raise RuntimeError("generation failed")
+
+
+def test_writer_close_is_idempotent(tmp_path: Path) -> None:
+    path = tmp_path / "rows.jsonl"
+    writer = BackgroundJsonlWriter(path)
+    writer.write({"i": 0})
+    writer.close()
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.write({"i": 1})
+    assert [row["i"] for row in read_jsonl(path)] == [0]
@@ -17,6 +17,8 @@ class _PromptLoader(BaseGenerator):
         # Skip BaseGenerator init to avoid LLMClient creation.
         self.scenario = "qa_rule"
         self.config = config
+        self._template_cache = {}
+        self._prompt_base_vars = None
 
 
 def _build_prompt(loader: _PromptLoader, template_path: str) -> str:
@@ -144,7 +144,7 @@ class TestRetrieverFallback(unittest.TestCase):
                 # 1. Fallback search -> []
                 # 2. Balancing search for 'service' -> should prioritize 'user' if query is 'user'
                 
-                def kw_side_effect(query, symbols, top_k, language_profile):
+                def kw_side_effect(query, symbols, top_k, language_profile, index=None):
                     if len(symbols) == 3: return [] # Fallback
                     if len(symbols) == 2: return [self.s1] # Balancing (UserService vs StringUtils)
                     return []
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.parser.ast_cache import SymbolCache
+from src.parser.python_parser import PythonParser
+from src.schemas import CodeSymbol
+
+
+def _symbol(name: str, source: str) -> CodeSymbol:
+    return CodeSymbol(
+        symbol_id=f"pkg/mod.py:{name}:1",
+        symbol_type="method",
+        name=name,
+        qualified_name=f"pkg.mod.{name}",
+        file_path="pkg/mod.py",
+        start_line=1,
+        end_line=2,
+        source=source,
+        repo_commit="c1",
+        source_hash=hashlib.sha256(source.encode("utf-8")).hexdigest(),
+    )
+
+
+def _parser(cache_path: Path) -> PythonParser:
+    return PythonParser({
+        "language": {"name": "python", "profile_dir": str(REPO_ROOT / "configs" / "language")},
+        # tmp_path lives under pytest-of-*/test_*, so keep test-looking paths
+        "parsing": {"symbol_cache_path": str(cache_path), "include_test": True},
+    })
+
+
+def test_symbol_cache_hit_and_miss(tmp_path: Path) -> None:
+    db_path = tmp_path / "symbols.sqlite"
+    digest = hashlib.sha256(b"def run(): pass").digest()
+    symbols = [_symbol("run", "def run(): pass")]
+
+    with SymbolCache(db_path, "sig-1") as cache:
+        assert cache.get("pkg/mod.py", digest) is None
+        cache.put("pkg/mod.py", digest, symbols)
+        assert cache.get("pkg/mod.py", digest) == symbols
+        # Changed content (different digest) is a miss
+        assert cache.get("pkg/mod.py", hashlib.sha256(b"def run(): return 1").digest()) is None
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    # Entries survive reopening the database with the same signature
+    with SymbolCache(db_path, "sig-1") as cache:
+        assert cache.get("pkg/mod.py", digest) == symbols
+
+
+def test_symbol_cache_invalidated_by_signature(tmp_path: Path) -> None:
+    db_path = tmp_path / "symbols.sqlite"
+    digest = hashlib.sha256(b"def run(): pass").digest()
+
+    with SymbolCache(db_path, "sig-1") as cache:
+        cache.put("pkg/mod.py", digest, [_symbol("run", "def run(): pass")])
+
+    with SymbolCache(db_path, "sig-2") as cache:
+        assert cache.get("pkg/mod.py", digest) is None
+        assert cache.misses == 1
+
+
+def test_symbol_cache_batch_rolls_back_on_error(tmp_path: Path) -> None:
+    db_path = tmp_path / "symbols.sqlite"
+    digest = hashlib.sha256(b"def run(): pass").digest()
+
+    with SymbolCache(db_path, "sig-1") as cache:
+        try:
+            with cache.batch():
+                cache.put("pkg/mod.py", digest, [_symbol("run", "def run(): pass")])
+                raise RuntimeError("parse failed")
+        except RuntimeError:
+            pass
+        assert cache.get("pkg/mod.py", digest) is None
+
+
+def test_parse_repo_reuses_cache_until_version_changes(tmp_path: Path, monkeypatch) -> None:
+    repo = tmp_path / "repo"
+    (repo / "pkg").mkdir(parents=True)
+    (repo / "pkg" / "mod.py").write_text("def run():\n    return 1\n\n\nclass Job:\n    pass\n", encoding="utf-8")
+    cache_path = tmp_path / "cache" / "symbols.sqlite"
+    # Ignore rules match path substrings, and tmp_path itself contains "test"
+    monkeypatch.chdir(repo)
+
+    lookups: list[bool] = []
+    original_get = SymbolCache.get
+
+    def recording_get(self, path, digest):
+        cached = original_get(self, path, digest)
+        lookups.append(cached is not None)
+        return cached
+
+    monkeypatch.setattr(SymbolCache, "get", recording_get)
+
+    first = _parser(cache_path).parse_repo(".", "c1")
+    assert first
+    assert lookups == [False]
+
+    # Warm run: same content and settings, symbols come from the cache re-stamped with the new commit
+    lookups.clear()
+    warm_parser = _parser(cache_path)
+    warm = warm_parser.parse_repo(".", "c2")
+    assert lookups == [True]
+    assert {s.repo_commit for s in warm} == {"c2"}
+    assert [s.model_copy(update={"repo_commit": "c1"}) for s in warm] == first
+    # The connection is closed when parse_repo finishes
+    assert warm_parser._symbol_cache is None
+
+    # Bumping the extraction version changes the signature, so the file is parsed again
+    lookups.clear()
+    monkeypatch.setattr(PythonParser, "SYMBOL_CACHE_VERSION", PythonParser.SYMBOL_CACHE_VERSION + 1)
+    assert _parser(cache_path).parse_repo(".", "c1") == first
+    assert lookups == [False]
+
+
+def test_parse_file_outside_parse_repo_does_not_open_cache(tmp_path: Path) -> None:
+    source_file = tmp_path / "mod.py"
+    source_file.write_text("def run():\n    return 1\n", encoding="utf-8")
+    cache_path = tmp_path / "cache" / "symbols.sqlite"
+
+    parser = _parser(cache_path)
+    assert parser.parse_file(source_file, "c1", repo_root=tmp_path)
+    assert parser._symbol_cache is None
+    assert not cache_path.exists()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.engine.generators.method_profile.understander import MethodUnderstander
+from src.schemas import CodeSymbol
+
+
+def _symbol(name: str) -> CodeSymbol:
+    return CodeSymbol(
+        symbol_id=f"demo/Svc.java:demo.Svc.{name}:1",
+        symbol_type="method",
+        name=name,
+        qualified_name=f"demo.Svc.{name}",
+        file_path="demo/Svc.java",
+        start_line=1,
+        end_line=3,
+        source=f"void {name}() {{}}",
+        repo_commit="c1",
+        source_hash=f"hash-{name}",
+    )
+
+
+def _profile_dict(symbol: CodeSymbol) -> dict:
+    return {
+        "symbol_id": symbol.symbol_id,
+        "file_path": symbol.file_path,
+        "qualified_name": symbol.qualified_name,
+        "summary": f"{symbol.name} summary",
+        "evidence_refs": [{
+            "symbol_id": symbol.symbol_id,
+            "file_path": symbol.file_path,
+            "start_line": symbol.start_line,
+            "end_line": symbol.end_line,
+            "source_hash": symbol.source_hash,
+        }],
+        "repo_commit": "c1",
+    }
+
+
+class _ScriptedUnderstander(MethodUnderstander):
+    """Skips BaseGenerator init (no LLMClient); answers prompts from a script"""
+
+    def __init__(self, symbols: list[CodeSymbol], multi_output=None, failing_ids: frozenset = frozenset()):
+        self.minify_prompt_source = False
+        self._symbols = {s.symbol_id: s for s in symbols}
+        self._multi_output = multi_output
+        self._failing_ids = failing_ids
+        self.single_calls: list[str] = []
+        self.multi_calls = 0
+
+    def _build_composed_system_prompt(self, **kwargs) -> str:
+        return "system"
+
+    def _build_composed_user_prompt(self, template_name: str, **kwargs) -> str:
+        if template_name == "user_multi":
+            return "multi"
+        return kwargs["symbol_id"]
+
+    def generate_with_retry(self, system_prompt: str, user_prompt: str, max_retries: int = 2) -> dict:
+        if user_prompt == "multi":
+            self.multi_calls += 1
+            if isinstance(self._multi_output, Exception):
+                raise self._multi_output
+            return self._multi_output
+        self.single_calls.append(user_prompt)
+        if user_prompt in self._failing_ids:
+            raise ValueError("llm output rejected")
+        return _profile_dict(self._symbols[user_prompt])
+
+
+def test_missing_symbol_is_retried_alone() -> None:
+    a, b, c = _symbol("a"), _symbol("b"), _symbol("c")
+    understander = _ScriptedUnderstander([a, b, c], {"profiles": [_profile_dict(a), _profile_dict(c)]})
+
+    results = list(understander._understand_chunk([a, b, c], "c1"))
+
+    assert understander.multi_calls == 1
+    assert understander.single_calls == [b.symbol_id]
+    assert [(s.symbol_id, p.symbol_id, e) for s, p, e in results] == [
+        (a.symbol_id, a.symbol_id, None),
+        (b.symbol_id, b.symbol_id, None),
+        (c.symbol_id, c.symbol_id, None),
+    ]
+
+
+def test_malformed_symbol_is_retried_alone() -> None:
+    a, b, c = _symbol("a"), _symbol("b"), _symbol("c")
+    malformed = _profile_dict(b)
+    del malformed["summary"]
+    understander = _ScriptedUnderstander(
+        [a, b, c], {"profiles": [_profile_dict(a), malformed, _profile_dict(c), "not a profile"]}
+    )
+
+    results = list(understander._understand_chunk([a, b, c], "c1"))
+
+    assert understander.single_calls == [b.symbol_id]
+    assert [p.summary for _, p, _ in results] == ["a summary", "b summary", "c summary"]
+
+
+def test_failed_multi_call_falls_back_per_symbol() -> None:
+    a, b = _symbol("a"), _symbol("b")
+    understander = _ScriptedUnderstander([a, b], RuntimeError("timeout"))
+
+    results = list(understander._understand_chunk([a, b], "c1"))
+
+    assert understander.single_calls == [a.symbol_id, b.symbol_id]
+    assert all(e is None for _, _, e in results)
+
+
+def test_single_retry_failure_only_rejects_that_symbol() -> None:
+    a, b = _symbol("a"), _symbol("b")
+    understander = _ScriptedUnderstander(
+        [a, b], {"profiles": [_profile_dict(a)]}, failing_ids=frozenset({b.symbol_id})
+    )
+
+    results = list(understander._understand_chunk([a, b], "c1"))
+
+    assert understander.single_calls == [b.symbol_id]
+    (sym_a, profile_a, error_a), (sym_b, profile_b, error_b) = results
+    assert (profile_a.symbol_id, error_a) == (a.symbol_id, None)
+    assert profile_b is None and isinstance(error_b, ValueError)
+
+
+def test_single_symbol_chunk_skips_multi_call() -> None:
+    a = _symbol("a")
+    understander = _ScriptedUnderstander([a], {"profiles": []})
+
+    results = list(understander._understand_chunk([a], "c1"))
+
+    assert understander.multi_calls == 0
+    assert understander.single_calls == [a.symbol_id]
+    assert results[0][1].symbol_id == a.symbol_id
@@ -13,6 +13,11 @@ class Config:
     
     _instance = None
     _config: dict = {}
+    # get() 解析结果缓存（键路径 -> 值）；reload/_set_nested 时失效
+    _get_cache: dict = {}
+    # 已确认存在的输出目录，避免重复 mkdir 系统调用
+    _ensured_dirs: set = set()
+    _MISSING = object()
     
     def __new__(cls):
         if cls._instance is None:
@@ -45,6 +50,8 @@ class Config:
         # 读取 YAML 配置
         with open(config_path, 'r', encoding='utf-8') as f:
             self._config = yaml.safe_load(f) or {}
+        self._get_cache = {}
+        self._ensured_dirs = set()
         
         # 应用环境变量覆盖
         self._apply_env_overrides()
@@ -99,10 +106,11 @@ class Config:
             d = d[key]
         
         d[keys[-1]] = value
+        self._get_cache = {}
     
     def get(self, key_path: str, default: Any = None) -> Any:
         """
-        获取配置值
+        获取配置值（解析结果按键路径缓存；直接修改 get_config() 返回的字典后需 reload）
         
         Args:
             key_path: 点分隔的键路径，如 "llm.base_url"
@@ -111,16 +119,18 @@ class Config:
         Returns:
             配置值或默认值
         """
-        keys = key_path.split('.')
-        value = self._config
-        
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        
-        return value
+        value = self._get_cache.get(key_path, self._MISSING)
+        if value is self._MISSING:
+            value = self._config
+            for key in key_path.split('.'):
+                if isinstance(value, dict) and key in value:
+                    value = value[key]
+                else:
+                    value = self._MISSING
+                    break
+            self._get_cache[key_path] = value
+        
+        return default if value is self._MISSING else value
     
     def get_section(self, section: str) -> dict:
         """
@@ -199,7 +209,10 @@ class Config:
     def ensure_output_dirs(self):
         """确保所有输出目录存在"""
         for dir_path in self.output_dirs.values():
+            if dir_path in self._ensured_dirs:
+                continue
             Path(dir_path).mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(dir_path)
     
     def get_language_profile(self, language_name: str | None = None):
         """
@@ -39,6 +39,7 @@ from .coverage import (
     infer_module_span,
     infer_bucket,
     apply_evidence_bucket,
+    coverage_of,
     compute_distribution,
     compute_multi_distributions,
     normalize_targets,
@@ -79,6 +80,7 @@ __all__ = [
     "infer_module_span",
     "infer_bucket",
     "apply_evidence_bucket",
+    "coverage_of",
     "compute_distribution",
     "compute_multi_distributions",
     "normalize_targets",
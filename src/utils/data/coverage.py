@@ -3,8 +3,8 @@ Coverage Utilities - 覆盖率标记与采样相关工具
 
 提供覆盖率桶推断、意图推断、分布计算等通用函数。
 """
-from collections import defaultdict
-from typing import Any
+from collections import Counter
+from typing import Any, Iterable
 
 from src.utils.data.validator import normalize_path_separators
 
@@ -53,19 +53,20 @@ FALLBACK_CHAIN = {
 }
 
 
-def infer_intent(text: str) -> str:
+def infer_intent(text: str, already_lower: bool = False) -> str:
     """从文本推断意图类型
     
     Args:
         text: 问题或答案文本
+        already_lower: text 是否已转为小写（调用方复用同一份小写文本时避免重复 lower）
         
     Returns:
         str: 推断的意图类型
     """
-    lowered = text.lower()
+    lowered_text = text if already_lower else text.lower()
     for intent, keywords in INTENT_KEYWORDS.items():
         for kw in keywords:
-            if kw in lowered:
+            if kw in lowered_text:
                 return intent
     return "how_to"
 
@@ -95,20 +96,24 @@ def infer_module_span(evidence_refs: list[dict]) -> str:
     return "multi" if len(prefixes) > 1 else "single"
 
 
-def infer_bucket(intent: str, module_span: str, text: str) -> str:
+def infer_bucket(intent: str, module_span: str, text: str, already_lower: bool = False) -> str:
     """推断覆盖率桶
     
     Args:
         intent: 意图类型
         module_span: 模块跨度
         text: 文本内容
+        already_lower: text 是否已转为小写
         
     Returns:
         str: "high", "mid", 或 "hard"
     """
-    lowered = text.lower()
-    if intent in ("compatibility", "edge") or any(kw in lowered for kw in HARD_KEYWORDS):
+    if intent in ("compatibility", "edge"):
         return "hard"
+    lowered_text = text if already_lower else text.lower()
+    for kw in HARD_KEYWORDS:
+        if kw in lowered_text:
+            return "hard"
     if module_span == "multi" or intent in ("perf", "consistency"):
         return "mid"
     return "high"
@@ -162,6 +167,28 @@ def apply_evidence_bucket(
     return candidate if cand_rank > base_rank else bucket
 
 
+# 缺少覆盖率标签时的共享空字典（只读，勿修改）
+_EMPTY_COVERAGE: dict = {}
+
+
+def coverage_of(sample: dict) -> dict:
+    """取样本的 quality.coverage 标签
+    
+    标签齐全是常见情况，直接下标访问比逐层 .get(..., {}) 少建临时字典；
+    缺失时返回共享的空字典。
+    
+    Args:
+        sample: 样本
+        
+    Returns:
+        dict: 覆盖率标签（缺失时为空字典）
+    """
+    try:
+        return sample["quality"]["coverage"]
+    except (KeyError, TypeError):
+        return _EMPTY_COVERAGE
+
+
 def compute_distribution(samples: list[dict], field_path: str = "quality.coverage.bucket") -> dict:
     """计算样本分布
     
@@ -197,32 +224,36 @@ def compute_distribution(samples: list[dict], field_path: str = "quality.coverag
     return {"counts": counts, "ratios": ratios, "total": total}
 
 
-def compute_multi_distributions(samples: list[dict]) -> dict:
+def compute_multi_distributions(samples: Iterable[dict]) -> dict:
     """计算多维度分布（bucket, intent, module_span, polarity）
     
     Args:
-        samples: 样本列表
+        samples: 样本列表（也可以是只遍历一次的迭代器，如 iter_jsonl 的流式读取）
         
     Returns:
         dict: 包含各维度分布的字典
     """
-    total = len(samples)
-    bucket_counts: dict[str, int] = defaultdict(int)
-    intent_counts: dict[str, int] = defaultdict(int)
-    module_counts: dict[str, int] = defaultdict(int)
-    polarity_counts: dict[str, int] = defaultdict(int)
-
-    for sample in samples:
-        coverage = sample.get("quality", {}).get("coverage", {})
-        bucket = coverage.get("bucket") or "high"
-        intent = coverage.get("intent") or "unknown"
-        module_span = coverage.get("module_span") or "unknown"
-        polarity = coverage.get("polarity") or "positive"
-
-        bucket_counts[bucket] += 1
-        intent_counts[intent] += 1
-        module_counts[module_span] += 1
-        polarity_counts[polarity] += 1
+    # 先由 Counter（C 实现）统计四个维度的组合，组合数远小于样本数；
+    # 再按组合首次出现的顺序汇总到各维度，键顺序与逐样本累加一致
+    combos = Counter(
+        (
+            coverage.get("bucket") or "high",
+            coverage.get("intent") or "unknown",
+            coverage.get("module_span") or "unknown",
+            coverage.get("polarity") or "positive",
+        )
+        for coverage in map(coverage_of, samples)
+    )
+    total = sum(combos.values())
+    bucket_counts: dict[str, int] = {}
+    intent_counts: dict[str, int] = {}
+    module_counts: dict[str, int] = {}
+    polarity_counts: dict[str, int] = {}
+    for (bucket, intent, module_span, polarity), count in combos.items():
+        bucket_counts[bucket] = bucket_counts.get(bucket, 0) + count
+        intent_counts[intent] = intent_counts.get(intent, 0) + count
+        module_counts[module_span] = module_counts.get(module_span, 0) + count
+        polarity_counts[polarity] = polarity_counts.get(polarity, 0) + count
 
     def ratios(counts: dict[str, int]) -> dict[str, float]:
         if total == 0:
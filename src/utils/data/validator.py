@@ -8,7 +8,7 @@ from typing import Any
 from collections import Counter
 
 from src.schemas import CodeSymbol, TrainingSample
-from src.utils.io.file_ops import read_jsonl, write_json, append_jsonl
+from src.utils.io.file_ops import read_jsonl, write_json, JsonlAppender
 
 
 def normalize_path_separators(path: str) -> str:
@@ -25,33 +25,65 @@ def normalize_path_separators(path: str) -> str:
     return path.replace('\\', '/')
 
 
+# Parsed symbol maps per resolved path, tagged with the file's (mtime_ns, size)
+_symbols_map_cache: dict[str, tuple[tuple[int, int], dict[str, CodeSymbol]]] = {}
+
+
 def load_symbols_map(symbols_jsonl: Path | str) -> dict[str, CodeSymbol]:
     """
     Load symbols from JSONL and build symbol_id -> CodeSymbol mapping.
     Normalizes symbol_ids to use forward slashes for cross-platform compatibility.
     
+    The parsed map is memoized per file and reused while the file's mtime/size are
+    unchanged, so pipeline steps sharing one symbols.jsonl parse it only once.
+    
     Args:
         symbols_jsonl: Path to symbols.jsonl file
         
     Returns:
-        Dict mapping normalized symbol_id to CodeSymbol
+        Dict mapping normalized symbol_id to CodeSymbol (a fresh dict per call)
     """
     symbols_jsonl = Path(symbols_jsonl)
-    symbols_map = {}
     
-    raw_lines = read_jsonl(symbols_jsonl)
+    if not symbols_jsonl.exists():
+        print(f"Loaded 0 symbols from {symbols_jsonl}")
+        return {}
     
-    for idx, raw_obj in enumerate(raw_lines, 1):
-        try:
-            symbol = CodeSymbol.model_validate(raw_obj)
-            # Normalize symbol_id for cross-platform compatibility
-            normalized_id = normalize_path_separators(symbol.symbol_id)
-            symbols_map[normalized_id] = symbol
-        except Exception as e:
-            print(f"Warning: Failed to parse symbol at line {idx}: {e}")
-            continue
+    stat = symbols_jsonl.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cache_key = str(symbols_jsonl.resolve())
+    cached = _symbols_map_cache.get(cache_key)
+    if cached is not None and cached[0] == signature:
+        print(f"Loaded {len(cached[1])} symbols from {symbols_jsonl} (cached)")
+        return dict(cached[1])
     
+    symbols_map = _parse_symbols_map(symbols_jsonl)
+    _symbols_map_cache[cache_key] = (signature, symbols_map)
     print(f"Loaded {len(symbols_map)} symbols from {symbols_jsonl}")
+    return dict(symbols_map)
+
+
+def clear_symbols_map_cache() -> None:
+    """Clear memoized symbol maps (useful for testing)"""
+    _symbols_map_cache.clear()
+
+
+def _parse_symbols_map(symbols_jsonl: Path) -> dict[str, CodeSymbol]:
+    symbols_map = {}
+    # Parse and validate each raw line in pydantic-core (no intermediate dict)
+    with open(symbols_jsonl, 'rb', buffering=1 << 20) as f:
+        for idx, line in enumerate(f, 1):
+            if line.isspace():
+                continue
+            try:
+                symbol = CodeSymbol.model_validate_json(line)
+                # Normalize symbol_id for cross-platform compatibility
+                normalized_id = normalize_path_separators(symbol.symbol_id)
+                symbols_map[normalized_id] = symbol
+            except Exception as e:
+                print(f"Warning: Failed to parse symbol at line {idx}: {e}")
+                continue
+    
     return symbols_map
 
 
@@ -475,82 +507,91 @@ def validate_dataset(
     # Read and validate each sample
     raw_lines = read_jsonl(input_jsonl)
     
-    for idx, raw_obj in enumerate(raw_lines, 1):
-        total += 1
+    # Rejected/clean outputs are each written through one handle, opened on first write
+    rejected_out = JsonlAppender(rejected_path)
+    clean_out = JsonlAppender(clean_path) if clean_path else None
+    try:
+        for idx, raw_obj in enumerate(raw_lines, 1):
+            total += 1
         
-        # Try to parse as TrainingSample
-        try:
-            sample = TrainingSample.model_validate(raw_obj)
-            schema_ok = True
-        except Exception as e:
-            # Schema validation failed
-            schema_ok = False
-            error_msg = f"Schema validation failed: {str(e)}"
-            error_counter["SCHEMA_INVALID"] += 1
-            quality = {
-                "gate_version": "v1",
-                "passed": False,
-                "errors": [_quality_issue("SCHEMA_INVALID", error_msg)],
-                "warnings": [],
-                "checks": {
-                    "schema": "fail",
-                    "evidence": "fail",
-                    "commit": "pass",
-                    "length": "pass",
-                    "scenario_rules": "pass",
-                },
-                "stats": {},
-            }
+            # Try to parse as TrainingSample
+            try:
+                sample = TrainingSample.model_validate(raw_obj)
+                schema_ok = True
+            except Exception as e:
+                # Schema validation failed
+                schema_ok = False
+                error_msg = f"Schema validation failed: {str(e)}"
+                error_counter["SCHEMA_INVALID"] += 1
+                quality = {
+                    "gate_version": "v1",
+                    "passed": False,
+                    "errors": [_quality_issue("SCHEMA_INVALID", error_msg)],
+                    "warnings": [],
+                    "checks": {
+                        "schema": "fail",
+                        "evidence": "fail",
+                        "commit": "pass",
+                        "length": "pass",
+                        "scenario_rules": "pass",
+                    },
+                    "stats": {},
+                }
             
-            # Write to rejected
-            append_jsonl(rejected_path, {
-                "line": idx,
-                "error": error_msg,
-                "quality": quality,
-                "raw": raw_obj
-            })
-            failed += 1
-            continue
+                # Write to rejected
+                rejected_out.write({
+                    "line": idx,
+                    "error": error_msg,
+                    "quality": quality,
+                    "raw": raw_obj
+                })
+                failed += 1
+                continue
         
-        # Validate sample content
-        quality = validate_sample_obj(sample, symbols_map, config)
-
-        # Preserve generation metadata (e.g., coverage polarity) for downstream reporting.
-        if isinstance(sample.quality, dict):
-            coverage = sample.quality.get("coverage")
-            if isinstance(coverage, dict):
-                quality["coverage"] = coverage
-            if sample.quality.get("evidence_autofill"):
-                quality["evidence_autofill"] = True
-
-        # Track warnings regardless of pass/fail
-        for warning in quality["warnings"]:
-            warning_counter[warning["code"]] += 1
-        if quality.get("checks", {}).get("trace") == "warn":
-            trace_warning_samples += 1
-
-        # Check if passed all validations
-        if quality["passed"]:
-            passed += 1
-            if clean_path and write_clean:
-                sample_dict = sample.model_dump()
-                sample_dict["quality"] = quality
-                append_jsonl(clean_path, sample_dict)
-        else:
-            failed += 1
+            # Validate sample content
+            quality = validate_sample_obj(sample, symbols_map, config)
+
+            # Preserve generation metadata (e.g., coverage polarity) for downstream reporting.
+            if isinstance(sample.quality, dict):
+                coverage = sample.quality.get("coverage")
+                if isinstance(coverage, dict):
+                    quality["coverage"] = coverage
+                if sample.quality.get("evidence_autofill"):
+                    quality["evidence_autofill"] = True
+
+            # Track warnings regardless of pass/fail
+            for warning in quality["warnings"]:
+                warning_counter[warning["code"]] += 1
+            if quality.get("checks", {}).get("trace") == "warn":
+                trace_warning_samples += 1
+
+            # Check if passed all validations
+            if quality["passed"]:
+                passed += 1
+                if clean_path and write_clean:
+                    sample_dict = sample.model_dump()
+                    sample_dict["quality"] = quality
+                    clean_out.write(sample_dict)
+            else:
+                failed += 1
             
-            # Count errors
-            for error in quality["errors"]:
-                error_counter[error["code"]] += 1
+                # Count errors
+                for error in quality["errors"]:
+                    error_counter[error["code"]] += 1
             
-            # Write to rejected
-            append_jsonl(rejected_path, {
-                "line": idx,
-                "scenario": sample.scenario,
-                "instruction": sample.instruction[:100] + "..." if len(sample.instruction) > 100 else sample.instruction,
-                "quality": quality,
-                "raw": raw_obj
-            })
+                # Write to rejected
+                rejected_out.write({
+                    "line": idx,
+                    "scenario": sample.scenario,
+                    "instruction": sample.instruction[:100] + "..." if len(sample.instruction) > 100 else sample.instruction,
+                    "quality": quality,
+                    "raw": raw_obj
+                })
+    
+    finally:
+        rejected_out.close()
+        if clean_out is not None:
+            clean_out.close()
     
     # Calculate statistics
     pass_rate = passed / total if total > 0 else 0.0
@@ -1,4 +1,5 @@
 """Language Profile Loader - Load language-specific QA/Design rules from YAML"""
+import re
 from pathlib import Path
 from typing import Optional
 import yaml
@@ -11,6 +12,15 @@ logger = get_logger(__name__)
 _profile_cache = {}
 
 
+def _compile_keywords(keywords: list) -> Optional[re.Pattern]:
+    """Compile substring keywords into a single alternation (None if empty)"""
+    if not keywords:
+        return None
+    # Longer keywords first so overlapping alternatives don't shadow each other
+    ordered = sorted({str(kw) for kw in keywords}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(kw) for kw in ordered))
+
+
 class LanguageProfile:
     """Language profile containing QA and Design generation rules"""
     
@@ -19,6 +29,20 @@ class LanguageProfile:
         self._validate_schema(data)
         self.data = data
         self.language = data["language"]
+        # Precompiled matching rules per design layer:
+        # (annotation/decorator names, name keyword pattern, path keyword pattern)
+        self._layer_matchers = {
+            layer_name: (
+                frozenset(layer_rules.get('annotations', [])) | frozenset(layer_rules.get('decorators', [])),
+                _compile_keywords(layer_rules.get('name_keywords', [])),
+                _compile_keywords(layer_rules.get('path_keywords', [])),
+            )
+            for layer_name, layer_rules in data["design"]["layers"].items()
+        }
+        # (name, qualified_name, file_path, annotation names) -> frozenset of matched layer names
+        # Unbounded: one small entry per symbol, and the inputs don't change during a run.
+        # Only single get/set operations are used, so threads can share it without a lock.
+        self._symbol_layers_cache: dict = {}
     
     @staticmethod
     def _validate_schema(data: dict):
@@ -143,8 +167,7 @@ class LanguageProfile:
         Returns:
             bool: True if symbol matches controller layer rules
         """
-        layer_rules = self.get_design_layer('controller')
-        return self._matches_layer_rules(symbol, layer_rules)
+        return 'controller' in self._symbol_layers(symbol)
     
     def is_service(self, symbol) -> bool:
         """Check if symbol is a service using profile rules
@@ -155,8 +178,7 @@ class LanguageProfile:
         Returns:
             bool: True if symbol matches service layer rules
         """
-        layer_rules = self.get_design_layer('service')
-        return self._matches_layer_rules(symbol, layer_rules)
+        return 'service' in self._symbol_layers(symbol)
     
     def is_repository(self, symbol) -> bool:
         """Check if symbol is a repository using profile rules
@@ -167,8 +189,7 @@ class LanguageProfile:
         Returns:
             bool: True if symbol matches repository layer rules
         """
-        layer_rules = self.get_design_layer('repository')
-        return self._matches_layer_rules(symbol, layer_rules)
+        return 'repository' in self._symbol_layers(symbol)
     
     def get_layer(self, symbol) -> str | None:
         """Get the layer type for a symbol
@@ -197,45 +218,55 @@ class LanguageProfile:
         Returns:
             list: Symbols matching the specified layer
         """
-        layer_check = {
-            'controller': self.is_controller,
-            'service': self.is_service,
-            'repository': self.is_repository,
-        }.get(layer)
-        
-        if not layer_check:
+        if layer not in ('controller', 'service', 'repository'):
             return []
-        return [s for s in symbols if layer_check(s)]
+        return [s for s in symbols if layer in self._symbol_layers(s)]
     
-    def _matches_layer_rules(self, symbol, layer_rules: dict) -> bool:
+    def _symbol_layers(self, symbol) -> frozenset:
+        """Get all layers a symbol matches (memoized on the fields the rules read)
+        
+        Layer rules are fixed for the profile's lifetime, so each symbol is
+        matched against every layer once and reused by is_*/get_layer/filter_by_layer.
+        The key covers every input of _matches_layer_rules, including annotations.
+        """
+        key = (
+            symbol.name,
+            symbol.qualified_name,
+            symbol.file_path,
+            tuple(ann.name for ann in symbol.annotations),
+        )
+        layers = self._symbol_layers_cache.get(key)
+        if layers is None:
+            layers = frozenset(
+                layer_name for layer_name in self._layer_matchers
+                if self._matches_layer_rules(symbol, layer_name)
+            )
+            self._symbol_layers_cache[key] = layers
+        return layers
+    
+    def _matches_layer_rules(self, symbol, layer_name: str) -> bool:
         """Generic layer matching based on profile rules
         
         Args:
             symbol: CodeSymbol object
-            layer_rules: Dict with annotations, decorators, name_keywords, path_keywords
+            layer_name: Layer whose annotations, decorators, name_keywords, path_keywords apply
             
         Returns:
             bool: True if symbol matches any rule
         """
-        # Check annotations/decorators (both in symbol.annotations)
-        symbol_annotations = {ann.name for ann in symbol.annotations}
-        profile_annotations = set(layer_rules.get('annotations', []))
-        profile_decorators = set(layer_rules.get('decorators', []))
+        markers, name_re, path_re = self._layer_matchers.get(layer_name, (frozenset(), None, None))
         
-        if symbol_annotations & (profile_annotations | profile_decorators):
+        # Check annotations/decorators (both in symbol.annotations)
+        if markers and any(ann.name in markers for ann in symbol.annotations):
             return True
         
         # Check name keywords
-        name_keywords = layer_rules.get('name_keywords', [])
-        name_lower = symbol.name.lower()
-        qualified_lower = symbol.qualified_name.lower()
-        if any(kw in name_lower or kw in qualified_lower for kw in name_keywords):
-            return True
+        if name_re is not None:
+            if name_re.search(symbol.name.lower()) or name_re.search(symbol.qualified_name.lower()):
+                return True
         
         # Check path keywords
-        path_keywords = layer_rules.get('path_keywords', [])
-        path_lower = symbol.file_path.lower()
-        if any(kw in path_lower for kw in path_keywords):
+        if path_re is not None and path_re.search(symbol.file_path.lower()):
             return True
         
         return False
@@ -288,15 +319,16 @@ def load_language_profile(
         else:
             profile_dir = config.get("language", {}).get("profile_dir", "configs/language")
     
-    # Check cache
-    cache_key = f"{profile_dir}/{language_name}"
+    # Construct profile path
+    profile_path = Path(profile_dir) / f"{language_name}.yaml"
+    
+    # Check cache (keyed by the resolved file path, so relative/absolute spellings of the
+    # same profile_dir share one entry and a later cwd change cannot return a stale profile)
+    cache_key = str(profile_path.resolve())
     if cache_key in _profile_cache:
         logger.debug(f"Using cached language profile: {cache_key}")
         return _profile_cache[cache_key]
     
-    # Construct profile path
-    profile_path = Path(profile_dir) / f"{language_name}.yaml"
-    
     if not profile_path.exists():
         raise FileNotFoundError(
             f"Language profile not found: {profile_path}\n"
@@ -8,14 +8,18 @@ from .file_ops import (
     read_json,
     write_json,
     read_jsonl,
+    iter_jsonl,
     write_jsonl,
     append_jsonl,
+    JsonlAppender,
+    BackgroundJsonlWriter,
     load_prompt_template,
     load_yaml_file,
     load_yaml_list,
     clean_llm_json_output,
 )
 from .loaders import (
+    iter_symbols_jsonl,
     load_symbols_jsonl,
     load_profiles_jsonl,
     load_architecture_constraints,
@@ -32,13 +36,17 @@ __all__ = [
     "read_json",
     "write_json",
     "read_jsonl",
+    "iter_jsonl",
     "write_jsonl",
     "append_jsonl",
+    "JsonlAppender",
+    "BackgroundJsonlWriter",
     "load_prompt_template",
     "load_yaml_file",
     "load_yaml_list",
     "clean_llm_json_output",
     # Loaders
+    "iter_symbols_jsonl",
     "load_symbols_jsonl",
     "load_profiles_jsonl",
     "load_architecture_constraints",
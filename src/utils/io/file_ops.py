@@ -4,8 +4,10 @@
 提供 JSON、JSONL、YAML 文件的读写功能，自动创建父目录。
 """
 import json
+import queue
+import threading
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
 import yaml
 
@@ -16,6 +18,9 @@ try:
 except ImportError:
     HAS_ORJSON = False
 
+# write_jsonl flushes its serialization buffer once it grows past this size
+WRITE_FLUSH_BYTES = 1 << 20
+
 
 def read_json(path: Path | str) -> dict | None:
     """
@@ -58,6 +63,7 @@ def write_json(path: Path | str, obj: Any, indent: int = 2) -> None:
 def read_jsonl(path: Path | str) -> list[dict]:
     """
     Read JSONL file and return list of dicts.
+    Uses orjson if available for better performance (see iter_jsonl).
     
     Args:
         path: Path to JSONL file
@@ -65,23 +71,47 @@ def read_jsonl(path: Path | str) -> list[dict]:
     Returns:
         List of parsed dicts (empty list if file doesn't exist)
     """
+    return list(iter_jsonl(path))
+
+
+def _loads_jsonl_line(line: bytes) -> Any:
+    """Parse one JSONL line with orjson, falling back to json for what orjson rejects (NaN/Infinity)"""
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(line)
+
+
+def iter_jsonl(path: Path | str) -> Iterator[dict]:
+    """
+    Stream dicts from a JSONL file without materializing the full list.
+    
+    Yields the same rows as read_jsonl (blank lines skipped, invalid lines reported
+    and skipped). Lines are read in binary through a large buffer and parsed with
+    orjson when available, so no per-line text decoding is done.
+    
+    Args:
+        path: Path to JSONL file
+        
+    Yields:
+        Parsed dicts (nothing if file doesn't exist)
+    """
     path = Path(path)
     if not path.exists():
-        return []
+        return
     
-    results = []
-    with open(path, 'r', encoding='utf-8') as f:
+    with open(path, 'rb', buffering=1 << 20) as f:
         for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
+            if line.isspace():
                 continue
             try:
-                results.append(json.loads(line))
-            except json.JSONDecodeError as e:
+                row = _loads_jsonl_line(line)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
                 print(f"Error parsing line {line_num} in {path}: {e}")
                 continue
-    
-    return results
+            yield row
 
 
 def write_jsonl(path: Path | str, rows: Iterable[dict]) -> None:
@@ -97,10 +127,19 @@ def write_jsonl(path: Path | str, rows: Iterable[dict]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     
     if HAS_ORJSON:
+        # Serialize into one buffer and flush it in ~1 MiB writes instead of
+        # two small write() calls per row
+        dumps = orjson.dumps
+        option = orjson.OPT_APPEND_NEWLINE
+        buf = bytearray()
         with open(path, 'wb') as f:
             for row in rows:
-                f.write(orjson.dumps(row))
-                f.write(b'\n')
+                buf += dumps(row, option=option)
+                if len(buf) >= WRITE_FLUSH_BYTES:
+                    f.write(buf)
+                    buf.clear()
+            if buf:
+                f.write(buf)
     else:
         with open(path, 'w', encoding='utf-8') as f:
             for row in rows:
@@ -129,6 +168,136 @@ def append_jsonl(path: Path | str, row: dict) -> None:
             f.write('\n')
 
 
+class JsonlAppender:
+    """
+    Append rows to a JSONL file through one lazily opened, buffered handle.
+    
+    Same output as repeated append_jsonl() calls, but the file is opened once (on the
+    first write, so no empty file is created when nothing is written) instead of once
+    per row. Call flush() where partial output must reach disk.
+    
+    Usage:
+        with JsonlAppender(path) as rejected:
+            rejected.write({"id": 1, "error": "..."})
+    """
+    
+    def __init__(self, path: Path | str, buffering: int = 1 << 16):
+        self.path = Path(path)
+        self._buffering = buffering
+        self._fh = None
+    
+    def write(self, row: dict) -> None:
+        """Append one dict as a JSON line"""
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, 'ab', buffering=self._buffering)
+        if HAS_ORJSON:
+            self._fh.write(orjson.dumps(row) + b'\n')
+        else:
+            self._fh.write(json.dumps(row, ensure_ascii=False).encode('utf-8') + b'\n')
+    
+    def flush(self) -> None:
+        if self._fh is not None:
+            self._fh.flush()
+    
+    def close(self) -> None:
+        """Flush and close the handle (idempotent)"""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+    
+    def __enter__(self) -> "JsonlAppender":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class BackgroundJsonlWriter:
+    """
+    Sequential JSONL writer drained by a background thread (producer-consumer queue).
+    
+    Producers call write() with a dict or an already-serialized JSON line; a single
+    writer thread owns the file handle, so generation never blocks on disk. The file
+    is flushed whenever the queue drains, keeping partial output crash-safe.
+    
+    Usage:
+        with BackgroundJsonlWriter(path) as writer:
+            writer.write({"a": 1})
+    """
+    
+    _SENTINEL = object()
+    
+    def __init__(self, path: Path | str, mode: str = 'w', maxsize: int = 1024):
+        """
+        Args:
+            path: Output JSONL path (parent directories are created)
+            mode: 'w' to truncate or 'a' to append
+            maxsize: Max queued rows before producers block (back-pressure)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, mode + 'b')
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._error: BaseException | None = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer_loop, name=f"jsonl-writer:{self.path.name}", daemon=True)
+        self._thread.start()
+    
+    def write(self, row: dict | str) -> None:
+        """Queue one row (dict, or a JSON string without trailing newline)"""
+        if self._closed:
+            raise ValueError(f"Writer for {self.path} is closed")
+        if self._error is not None:
+            raise self._error
+        if isinstance(row, str):
+            data = row.encode('utf-8')
+        elif HAS_ORJSON:
+            data = orjson.dumps(row)
+        else:
+            data = json.dumps(row, ensure_ascii=False).encode('utf-8')
+        self._queue.put(data + b'\n')
+    
+    def _writer_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is self._SENTINEL:
+                break
+            if self._error is not None:
+                continue  # drain remaining items after a failure
+            try:
+                self._fh.write(item)
+                if self._queue.empty():
+                    self._fh.flush()
+            except BaseException as e:
+                self._error = e
+    
+    def close(self) -> None:
+        """Drain pending rows, stop the writer thread and close the file (idempotent)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._SENTINEL)
+        self._thread.join()
+        self._fh.close()
+        if self._error is not None:
+            raise self._error
+    
+    def __enter__(self) -> "BackgroundJsonlWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # Already unwinding: a writer error must not replace the original exception
+        try:
+            self.close()
+        except BaseException as e:
+            from src.utils.core.logger import get_logger
+            get_logger(__name__).error(f"Background writer for {self.path} failed: {e}")
+
+
 def load_prompt_template(template_path: str | Path) -> str:
     """
     Load prompt template file with automatic relative path resolution.
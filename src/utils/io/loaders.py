@@ -3,21 +3,21 @@
 
 提供 CodeSymbol、MethodProfile 等数据模型的加载功能。
 """
-import json
 from pathlib import Path
+from typing import Iterator
 
 from .file_ops import read_jsonl, load_yaml_file
 
 
-def load_symbols_jsonl(path: Path | str) -> list:
+def iter_symbols_jsonl(path: Path | str) -> Iterator:
     """
-    Load CodeSymbol list from JSONL file.
+    Stream CodeSymbol objects from JSONL file without materializing the full list.
     
     Args:
         path: Path to symbols JSONL file
         
-    Returns:
-        list[CodeSymbol]: List of code symbols
+    Yields:
+        CodeSymbol: Parsed code symbols (invalid lines are logged and skipped)
         
     Raises:
         FileNotFoundError: If file doesn't exist
@@ -30,19 +30,37 @@ def load_symbols_jsonl(path: Path | str) -> list:
     if not path.exists():
         raise FileNotFoundError(f"Symbols file not found: {path}")
     
-    symbols = []
-    with open(path, 'r', encoding='utf-8') as f:
+    # 二进制读取 + pydantic 原生 JSON 校验：跳过文本解码与中间 dict；
+    # 空行用 bytes.isspace() 判断，不为每行再 strip 出一份副本（JSON 解析本身容忍首尾空白）
+    with open(path, 'rb', buffering=1 << 20) as f:
         for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
+            if line.isspace():
                 continue
             try:
-                data = json.loads(line)
-                symbol = CodeSymbol(**data)
-                symbols.append(symbol)
+                symbol = CodeSymbol.model_validate_json(line)
             except Exception as e:
                 logger.warning(f"Failed to parse symbol at line {line_num}: {e}")
+                continue
+            yield symbol
+
+
+def load_symbols_jsonl(path: Path | str) -> list:
+    """
+    Load CodeSymbol list from JSONL file.
+    
+    Args:
+        path: Path to symbols JSONL file
+        
+    Returns:
+        list[CodeSymbol]: List of code symbols
+        
+    Raises:
+        FileNotFoundError: If file doesn't exist
+    """
+    from src.utils.core.logger import get_logger
+    logger = get_logger(__name__)
     
+    symbols = list(iter_symbols_jsonl(path))
     logger.info(f"Loaded {len(symbols)} symbols from {path}")
     return symbols
 
@@ -3,14 +3,69 @@ Simple Keyword Search Utility (BM25-lite)
 Provides fallback retrieval when vector embeddings are missing.
 """
 import re
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from src.schemas import CodeSymbol
 
+
+def _profile_scoring(language_profile: Optional[Dict]) -> Tuple[Dict[str, float], Tuple[str, ...]]:
+    """Resolve scoring weights and boost keywords for a profile"""
+    weights = {
+        'name_match': 10.0,      # Exact token match in symbol name
+        'path_match': 5.0,       # Exact token match in file path
+        'source_match': 1.0,     # Exact token match in source code
+        'annotation_boost': 0.0, # Boost for having relevant annotations
+        'keyword_boost': 0.0     # Boost for matching profile keywords
+    }
+    if not language_profile:
+        return weights, ()
+    
+    # Load weights from profile if available
+    qa_scoring = language_profile.get('qa', {}).get('scoring', {})
+    weights['name_match'] = float(qa_scoring.get('name_keyword_weight', 10.0)) * 2.0 # Boost query match higher than static keywords
+    weights['annotation_boost'] = float(qa_scoring.get('annotation_weight', 0.0))
+    
+    # Load language specific keywords to boost
+    qa_markers = language_profile.get('qa', {}).get('markers', {})
+    profile_keywords = set()
+    profile_keywords.update(k.lower() for k in qa_markers.get('name_keywords', []))
+    profile_keywords.update(k.lower() for k in qa_markers.get('path_keywords', []))
+    
+    return weights, tuple(sorted(profile_keywords))
+
+
+def _symbol_fields(symbol: CodeSymbol, profile_keywords: Tuple[str, ...]) -> Tuple[str, str, str, float]:
+    """Lowercased (qualified_name, file_path, source) and the query-independent profile keyword boost"""
+    s_name = symbol.qualified_name.lower()
+    s_path = symbol.file_path.lower()
+    s_source = symbol.source.lower() if symbol.source else ""
+    boost = float(sum(1 for kw in profile_keywords if kw in s_name))
+    return s_name, s_path, s_source, boost
+
+
+class KeywordIndex:
+    """
+    Precomputed keyword-search state for one candidate symbol list.
+    
+    Built once (profile weights, lowercased fields and static boosts for every
+    symbol) and read-only afterwards, so a single index can be shared by
+    concurrent searches over that list or any subset of it.
+    """
+    
+    def __init__(self, symbols: List[CodeSymbol], language_profile: Optional[Dict] = None):
+        self.symbols = symbols
+        self.language_profile = language_profile
+        self.weights, self.profile_keywords = _profile_scoring(language_profile)
+        self.fields: Dict[str, Tuple[str, str, str, float]] = {
+            s.symbol_id: _symbol_fields(s, self.profile_keywords) for s in symbols
+        }
+
+
 def keyword_search(
     query: str, 
     symbols: List[CodeSymbol], 
     top_k: int = 5,
-    language_profile: Optional[Dict] = None
+    language_profile: Optional[Dict] = None,
+    index: Optional[KeywordIndex] = None
 ) -> List[CodeSymbol]:
     """
     Perform weighted keyword search on symbols.
@@ -20,6 +75,7 @@ def keyword_search(
         symbols: List of symbols to search
         top_k: Number of results to return
         language_profile: Optional language profile dict to boost specific keywords
+        index: Optional prebuilt KeywordIndex covering `symbols` (built for the same profile)
         
     Returns:
         List of top-k matching symbols
@@ -32,26 +88,12 @@ def keyword_search(
     if not tokens:
         return []
 
-    # 2. Get scoring weights from profile or defaults
-    weights = {
-        'name_match': 10.0,      # Exact token match in symbol name
-        'path_match': 5.0,       # Exact token match in file path
-        'source_match': 1.0,     # Exact token match in source code
-        'annotation_boost': 0.0, # Boost for having relevant annotations
-        'keyword_boost': 0.0     # Boost for matching profile keywords
-    }
-    
-    profile_keywords = set()
-    if language_profile:
-        # Load weights from profile if available
-        qa_scoring = language_profile.get('qa', {}).get('scoring', {})
-        weights['name_match'] = float(qa_scoring.get('name_keyword_weight', 10.0)) * 2.0 # Boost query match higher than static keywords
-        weights['annotation_boost'] = float(qa_scoring.get('annotation_weight', 0.0))
-        
-        # Load language specific keywords to boost
-        qa_markers = language_profile.get('qa', {}).get('markers', {})
-        profile_keywords.update(k.lower() for k in qa_markers.get('name_keywords', []))
-        profile_keywords.update(k.lower() for k in qa_markers.get('path_keywords', []))
+    # 2. Get scoring weights from profile or defaults (precomputed when an index is given)
+    if index is not None and index.language_profile is language_profile:
+        weights, profile_keywords, fields = index.weights, index.profile_keywords, index.fields
+    else:
+        weights, profile_keywords = _profile_scoring(language_profile)
+        fields = {}
 
     scored_symbols = []
     
@@ -59,9 +101,10 @@ def keyword_search(
         score = 0.0
         
         # Pre-process symbol fields
-        s_name = symbol.qualified_name.lower()
-        s_path = symbol.file_path.lower()
-        s_source = symbol.source.lower() if symbol.source else ""
+        entry = fields.get(symbol.symbol_id)
+        if entry is None:
+            entry = _symbol_fields(symbol, profile_keywords)
+        s_name, s_path, s_source, boost = entry
         
         # A. Query Token Matching
         for token in tokens:
@@ -88,9 +131,8 @@ def keyword_search(
             # regardless of query, implying importance? 
             # OR only boost if query ALSO contains them?
             # Let's boost if symbol matches high-value profile keywords to prefer "Business Logic"
-            for kw in profile_keywords:
-                if kw in s_name:
-                    score += 1.0 # Small boost for being a "Service" or "Controller" generally
+            # The boost is query-independent, so it comes with the precomputed fields
+            score += boost # Small boost for being a "Service" or "Controller" generally
 
         if score > 0:
             scored_symbols.append((score, symbol))
@@ -5,6 +5,8 @@
 """
 import json
 import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple
 
@@ -17,6 +19,13 @@ from src.utils.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 单次 embed 请求携带的文本数（Ollama /api/embed 支持批量输入）
+DEFAULT_EMBED_BATCH_SIZE = 64
+# 并发发送的 embedding 批次数；通常只有一个本地 Ollama 服务，并发过多只会在服务端排队
+DEFAULT_EMBED_WORKERS = 2
+# workers <= 0（按 CPU 数自动取值）时的上限
+MAX_AUTO_EMBED_WORKERS = 4
+
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """计算两个向量的余弦相似度
@@ -45,7 +54,9 @@ def build_embeddings(
     profiles_jsonl: Path,
     embeddings_jsonl: Path,
     embedding_model: str = "nomic-embed-text",
-    repo_commit: str = "UNKNOWN_COMMIT"
+    repo_commit: str = "UNKNOWN_COMMIT",
+    batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+    workers: int = DEFAULT_EMBED_WORKERS
 ) -> int:
     """为方法 profiles 构建向量索引
     
@@ -54,6 +65,8 @@ def build_embeddings(
         embeddings_jsonl: 输出的 embeddings JSONL 文件
         embedding_model: Ollama embedding 模型名称
         repo_commit: 仓库 commit hash
+        batch_size: 每次 embedding 请求合并的 profile 数（1 为逐条请求）
+        workers: 并发请求的批次数（<= 0 时取可用 CPU 数，且不超过 MAX_AUTO_EMBED_WORKERS）
         
     Returns:
         int: 成功处理的条目数
@@ -75,50 +88,99 @@ def build_embeddings(
     
     logger.info(f"Loaded {len(profiles)} profiles")
     
-    # 为每个 profile 生成 embedding
+    # 按批生成 embedding
     embeddings_path = Path(embeddings_jsonl)
     embeddings_path.parent.mkdir(parents=True, exist_ok=True)
+    batch_size = max(1, int(batch_size))
+    workers = int(workers) if workers else 0
+    if workers <= 0:
+        workers = min(_available_cpus(), MAX_AUTO_EMBED_WORKERS)
+    
+    batches = [profiles[start:start + batch_size] for start in range(0, len(profiles), batch_size)]
+    # 构造用于 embedding 的文本
+    batch_texts = [[_build_embedding_text(profile) for profile in batch] for batch in batches]
+    
+    def _embed(texts: List[str], batch: List[dict]) -> List[List[float] | None]:
+        return _embed_batch(texts, embedding_model, batch)
     
     success_count = 0
-    with open(embeddings_path, 'w', encoding='utf-8') as f:
-        for i, profile in enumerate(profiles, 1):
-            try:
-                # 构造用于 embedding 的文本
-                text = _build_embedding_text(profile)
-                
-                # 调用 Ollama embedding API
-                logger.debug(f"Generating embedding for {profile['symbol_id']} ({i}/{len(profiles)})")
-                response = ollama.embeddings(
-                    model=embedding_model,
-                    prompt=text
-                )
-                
-                embedding = response['embedding']
-                
-                # 写入 embedding
-                embedding_entry = {
-                    'symbol_id': profile['symbol_id'],
-                    'file_path': profile['file_path'],
-                    'qualified_name': profile['qualified_name'],
-                    'embedding': embedding,
-                    'text': text[:500],  # 保留前500字符用于调试
-                    'repo_commit': repo_commit
-                }
-                
-                f.write(json.dumps(embedding_entry, ensure_ascii=False) + '\n')
-                success_count += 1
-                
-                if i % 10 == 0:
-                    logger.info(f"Processed {i}/{len(profiles)} profiles")
-                    
-            except Exception as e:
-                logger.error(f"Failed to generate embedding for {profile.get('symbol_id', 'unknown')}: {e}")
-                continue
+    # 请求大部分时间在等待 Ollama 响应，用线程并发多个批次；map 按提交顺序返回，输出顺序不变
+    with open(embeddings_path, 'w', encoding='utf-8') as f, \
+         ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches))), thread_name_prefix="embed") as pool:
+        start = 0
+        for batch, texts, embeddings in zip(batches, batch_texts, pool.map(_embed, batch_texts, batches)):
+            for profile, text, embedding in zip(batch, texts, embeddings):
+                if embedding is None:
+                    continue
+                try:
+                    # 写入 embedding
+                    embedding_entry = {
+                        'symbol_id': profile['symbol_id'],
+                        'file_path': profile['file_path'],
+                        'qualified_name': profile['qualified_name'],
+                        'embedding': embedding,
+                        'text': text[:500],  # 保留前500字符用于调试
+                        'repo_commit': repo_commit
+                    }
+                    f.write(json.dumps(embedding_entry, ensure_ascii=False) + '\n')
+                    success_count += 1
+                except Exception as e:
+                    logger.error(f"Failed to generate embedding for {profile.get('symbol_id', 'unknown')}: {e}")
+            
+            end = start + len(batch)
+            if end // 10 > start // 10 or end == len(profiles):
+                logger.info(f"Processed {end}/{len(profiles)} profiles")
+            start = end
     
     logger.info(f"Successfully generated {success_count} embeddings")
     return success_count
 
 
+def _available_cpus() -> int:
+    """当前进程可用的 CPU 数（Linux 上遵循 CPU 亲和性/容器限制）"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _embed_batch(texts: List[str], embedding_model: str, profiles: List[dict]) -> List[List[float] | None]:
+    """一次请求生成一批文本的 embedding
+    
+    批量请求失败时退回逐条请求，单条失败只影响该条（对应位置为 None）。
+    
+    Args:
+        texts: 待向量化的文本
+        embedding_model: Ollama embedding 模型名称
+        profiles: 与 texts 一一对应的 profile（用于日志）
+        
+    Returns:
+        List: 与 texts 等长的向量列表
+    """
+    if len(texts) > 1:
+        try:
+            response = ollama.embed(model=embedding_model, input=texts)
+            embeddings = response['embeddings']
+            if len(embeddings) == len(texts):
+                return embeddings
+            logger.warning(f"Embedding batch returned {len(embeddings)} vectors for {len(texts)} texts; retrying one by one")
+        except Exception as e:
+            logger.warning(f"Batch embedding failed ({e}); retrying one by one")
+    
+    embeddings: List[List[float] | None] = []
+    for text, profile in zip(texts, profiles):
+        try:
+            logger.debug(f"Generating embedding for {profile.get('symbol_id', 'unknown')}")
+            response = ollama.embeddings(
+                model=embedding_model,
+                prompt=text
+            )
+            embeddings.append(response['embedding'])
+        except Exception as e:
+            logger.error(f"Failed to generate embedding for {profile.get('symbol_id', 'unknown')}: {e}")
+            embeddings.append(None)
+    return embeddings
+
+
 def _build_embedding_text(profile: dict) -> str:
     """构造用于 embedding 的文本
     
@@ -542,6 +542,9 @@ def _compute_distribution(samples: list[dict]) -> dict:
 
 
 def _compare_counts(scope: str, expected: dict, actual: dict, key: str) -> list[str]:
+    if key not in expected:
+        # coverage.emit_distributions: false leaves the distributions out of the report
+        return []
     exp_counts = expected.get(key, {}).get("counts", {})
     act_counts = actual.get(key, {}).get("counts", {})
     errors = []